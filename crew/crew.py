@@ -1,3 +1,6 @@
+import os
+import shlex
+
 from typing import List, Literal
 
 from pydantic import BaseModel
@@ -6,14 +9,26 @@ from mcp import StdioServerParameters
 from crewai import Agent, Crew, Task
 from crewai.project import CrewBase, agent, crew, task, tool
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
 
 from crew.tools import (
     DocumentChunkContextTool,
     DocumentSearchTool,
     WorkspaceFileWriteTool,
     WorkspaceFileReadTool,
+    WebSearchTool,
+    WebScrapeTool,
 )
+from crew.utils.checkpoints import TaskCheckpoints
+from crew.utils.llm_cache import cached_llm
+from crew.utils.mcp_pool import MCPToolPool, get_mcp_pool
+from crew.utils.scheduling import schedule_tasks
+
+# MCP_SERVER_COMMAND replaces the Atlassian server, e.g. with the stub in crew.utils.mcp_stub
+MCP_SERVER_COMMAND = shlex.split(os.getenv("MCP_SERVER_COMMAND", "")) or [
+    "uvx",
+    # https://github.com/sooperset/mcp-atlassian/issues/721#issuecomment-3405125937
+    "--with", "pydantic<2.12", "mcp-atlassian", "--env-file=.env", "--read-only",
+]
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
@@ -30,18 +45,28 @@ class ProjectResearchCrew:
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    # Upper bound of tasks running at the same time, see crew.utils.scheduling
+    max_parallel_tasks: int = int(os.getenv("CREW_MAX_PARALLEL_TASKS", "3"))
+
+    # Skip tasks whose checkpoint is still valid, see crew.utils.checkpoints
+    resume: bool = False
+
     mcp_server_params = [StdioServerParameters(
-        command="uvx",
-        # https://github.com/sooperset/mcp-atlassian/issues/721#issuecomment-3405125937
-        args=["--with", "pydantic<2.12", "mcp-atlassian", "--env-file=.env", "--read-only"],
+        command=MCP_SERVER_COMMAND[0],
+        args=MCP_SERVER_COMMAND[1:],
     )]
 
+    def mcp_tool_pool(self) -> MCPToolPool:
+        """The shared MCP connection, the server starts with the first tool request."""
+        return get_mcp_pool(self.mcp_server_params, connect_timeout=self.mcp_connect_timeout)  # type: ignore[attr-defined]
+
     @staticmethod
     def with_mcp_tools(task_method):
         """
         Decorator to add the appropriate MCP tools from the configuration to the task.
         Task-specific tools do not work with decorators when using MCP. Therefore, 
         they must be defined in a separate configuration field and injected at runtime.
+        The MCP server is only started if a task actually lists `mcp_tools`.
         """
         def wrapper(self, *args, **kwargs):
             # Call the original method to get the Task
@@ -50,10 +75,11 @@ class ProjectResearchCrew:
             # Determine the config name from the method name
             config_name = task_method.__name__
             config = self.tasks_config[config_name]
-            all_mcp_tools = self.get_mcp_tools()  # type: ignore
-            task_mcp_tools = [t for t in all_mcp_tools if t.name in config["mcp_tools"]]
-            tools = task.tools if isinstance(task.tools, list) else []
-            task.tools = tools + list(task_mcp_tools)
+            tool_names = config.get("mcp_tools") or []
+            if tool_names:
+                task_mcp_tools = self.mcp_tool_pool().tools(tool_names)
+                tools = task.tools if isinstance(task.tools, list) else []
+                task.tools = tools + list(task_mcp_tools)
 
             return task
 
@@ -87,11 +113,11 @@ class ProjectResearchCrew:
 
     @tool
     def web_search(self):
-        return SerperDevTool()
+        return WebSearchTool()
     
     @tool
     def scrape_website(self):
-        return ScrapeWebsiteTool()
+        return WebScrapeTool()
 
     @agent
     def intake_curator(self) -> Agent:
@@ -181,8 +207,21 @@ class ProjectResearchCrew:
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
+        # Serve or record LLM responses if an LLM cache mode is configured
+        for crew_agent in self.agents:
+            crew_agent.llm = cached_llm(crew_agent.llm)
+
+        # Every completed task is checkpointed, on resume only invalidated tasks run again.
+        # If all of them are up to date the crew has no tasks, kickoff returns the restored output.
+        self.checkpoints = TaskCheckpoints(resume=self.resume)
+        tasks = self.checkpoints.plan(self.tasks, self.tasks_config)  # type: ignore[arg-type]
+
+        # Independent tasks run concurrently, dependent ones in the order of their context
+        tasks = schedule_tasks(tasks, self.tasks_config, max_parallel=self.max_parallel_tasks)  # type: ignore[arg-type]
+
         return Crew(
             agents=self.agents,
-            tasks=self.tasks,
+            tasks=tasks,
+            task_callback=self.checkpoints.record,
             verbose=True,
         )
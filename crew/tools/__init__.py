@@ -2,3 +2,5 @@ from .document_search import DocumentSearchTool
 from .document_chunk_context import DocumentChunkContextTool
 from .workspace_file_write import WorkspaceFileWriteTool
 from .workspace_file_read import WorkspaceFileReadTool
+from .web_search import WebSearchTool
+from .web_scrape import WebScrapeTool
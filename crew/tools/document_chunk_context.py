@@ -1,16 +1,19 @@
 """
 Document Chunk Range Retriever Tool.
+
+Windows are served from the in-memory chunk store (see
+`crew.utils.chunk_store`) instead of a filtered scan of the collection.
 """
 import click
 
 from textwrap import dedent
 from typing import Type
 
-from chromadb.api import ClientAPI
 from pydantic import BaseModel, Field
 
 from crewai.tools import BaseTool
-from crewai.rag.config.utils import get_rag_client
+
+from crew.utils.chunk_store import get_chunk_store
 
 
 class DocumentChunkContextInput(BaseModel):
@@ -47,31 +50,13 @@ class DocumentChunkContextTool(BaseTool):
         ])
 
     def _run(self, filename: str, chunk_index: int, before_context: int = 0, after_context: int = 0) -> str:
-        client = get_rag_client()
-        chromadb: ClientAPI = client.client
-
-        lowest_chunk_index = chunk_index - before_context
-        highest_chunk_index = chunk_index + after_context
-
         # Exclude the chunk at chunk_index
-        result = chromadb.get_collection(name="knowledge").get(
-            where={
-                "$and": [
-                    {"filename": filename},
-                    {"chunk_index": {"$gte": lowest_chunk_index}},
-                    {"chunk_index": {"$lte": highest_chunk_index}},
-                    {"chunk_index": {"$ne": chunk_index}}
-                ]
-            }
-        )
-
-        documents = result.get("documents") or []
-        metadatas = result.get("metadatas") or []
-
-        return self._format_results([{
-            "content": doc,
-            "metadata": meta
-        } for doc, meta in zip(documents, metadatas)])
+        return self._format_results(get_chunk_store().window(
+            filename,
+            chunk_index,
+            before=before_context,
+            after=after_context,
+        ))
 
 
 @click.command()
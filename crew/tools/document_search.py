@@ -1,13 +1,26 @@
 """
 Document search tool with cross-encoder reranking for internal RAG.
 
-This module defines a CrewAI BaseTool that queries an internal vector
-database and then reranks the retrieved documents using the
-`cross-encoder/ms-marco-MiniLM-L-6-v2` model. The tool first fetches a
-fixed number of candidates from the "knowledge" collection
-(VECTOR_TOP_K), then applies the cross-encoder to score each
-(query, content) pair, adds the score to the result, and sorts in
-descending order of relevance.
+This module defines a CrewAI BaseTool that queries the knowledge vector
+store (see `crew.utils.vector_store`), fuses the hits with those of a BM25
+index over the same chunks (see `crew.utils.lexical_index`) and then
+reranks the candidates using the `cross-encoder/ms-marco-MiniLM-L-6-v2`
+model, loaded on first use and shared with concurrent searches (see
+`crew.utils.reranker`). The tool first fetches a fixed number of
+candidates from the "knowledge" collection (VECTOR_TOP_K) and the lexical
+index (LEXICAL_TOP_K), keeps the best FUSION_TOP_K by reciprocal rank,
+then applies the cross-encoder to score each (query, content) pair, adds
+the score to the result, and sorts in descending order of relevance. Results are cached per normalized query
+until the collection changes (see `crew.utils.search_cache`).
+
+Most queries are answered by the first few candidates, so by default the
+search is adaptive (see `RetrievalConfig`): only the best
+`initial_candidates` by fusion rank are cross-encoded, and a query gets
+more candidates only while the reranked scores suggest that relevant
+material is being cut off. Vector hits below a similarity floor (0.6, as
+the RAG client's search applies it) never become candidates. Vector hits
+far below the best vector score and results below a minimum rerank score
+can be dropped as well, the thresholds are calibrated with `main.py bench`.
 
 The `_run` method returns the top `limit` results (default: RERANK_TOP_K) as a
 single Markdown-formatted string. Each chunk includes:
@@ -17,31 +30,87 @@ single Markdown-formatted string. Each chunk includes:
 - the cross-encoder score
 - the original content
 
+With `queries`, several searches run as one batch: all queries are
+embedded and searched together, all candidate pairs are reranked in a
+single cross-encoder pass, and chunks that several queries share are
+printed only once.
+
 The tool is intended to be used before anything else search and
 should always query documents using the user's original language.
 """
-from typing import Type
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Type
 
+import os
 import click
+import json
 
 from textwrap import dedent
-from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, model_validator
 
 from crewai.tools import BaseTool
 from crewai.rag.types import SearchResult
-from crewai.rag.config.utils import get_rag_client
 
-from sentence_transformers import CrossEncoder
+from crew.utils.chunk_store import get_chunk_store
+from crew.utils.lexical_index import get_lexical_index
+from crew.utils.reranker import get_reranker
+from crew.utils.search_cache import get_search_cache
+from crew.utils.summary_index import get_summary_index
+from crew.utils.vector_store import get_vector_store
+
+# Load environment variables
+load_dotenv()
 
 
-VECTOR_TOP_K = 30
+VECTOR_TOP_K = 20
+LEXICAL_TOP_K = 20
+FUSION_TOP_K = 20  # Candidates passed to the cross-encoder
+RRF_K = 60
 RERANK_TOP_K = 5
 
-CROSS_ENCODER = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+@dataclass
+class RetrievalConfig:
+    """Candidate sizing and score thresholds of the document search."""
+    adaptive: bool = True  # Rerank a growing prefix of the candidates instead of all FUSION_TOP_K
+    initial_candidates: int = 10  # Candidates reranked first in adaptive mode
+    candidate_step: int = 10  # Candidates added per expansion
+    expand_tail: int = 3  # Expand while one of the last reranked candidates reaches the top RERANK_TOP_K
+    min_vector_score: float = 0.6  # Vector hits below are not candidates, 0 disables the floor
+    vector_score_margin: Optional[float] = None  # Vector hits further below the best one are not reranked
+    min_rerank_score: Optional[float] = None  # Results below are not returned
+
+    @classmethod
+    def from_env(cls) -> "RetrievalConfig":
+        """Create a configuration from SEARCH_* environment variables."""
+        return cls(
+            adaptive=os.getenv("SEARCH_ADAPTIVE", "1").lower() not in ("0", "false", "no"),
+            initial_candidates=int(os.getenv("SEARCH_INITIAL_CANDIDATES", cls.initial_candidates)),
+            candidate_step=int(os.getenv("SEARCH_CANDIDATE_STEP", cls.candidate_step)),
+            expand_tail=int(os.getenv("SEARCH_EXPAND_TAIL", cls.expand_tail)),
+            min_vector_score=float(os.getenv("SEARCH_MIN_VECTOR_SCORE") or cls.min_vector_score),
+            vector_score_margin=_optional_float("SEARCH_VECTOR_SCORE_MARGIN"),
+            min_rerank_score=_optional_float("SEARCH_MIN_RERANK_SCORE"),
+        )
+
 
 class DocumentSearchInput(BaseModel):
     """Input schema for DocumentSearchTool"""
-    query: str = Field(..., description="The search query")
+    query: Optional[str] = Field(None, description="The search query")
+    queries: Optional[List[str]] = Field(None, description="Several related search queries to run at once, results are grouped by query")
+    context_chunks: int = Field(0, ge=0, le=5, description="Number of neighbouring chunks before and after each result to include")
+
+    @model_validator(mode="after")
+    def check_query(self):
+        if not self.query and not self.queries:
+            raise ValueError("Either 'query' or 'queries' is required")
+        return self
 
 class DocumentSearchTool(BaseTool):
     name: str = "document_search"
@@ -51,85 +120,291 @@ class DocumentSearchTool(BaseTool):
         A tool to search internal documents for relevant information to answer questions.
         Always use this tool first before searching anywhere else. If you find relevant information,
         cite the filename as the source. Always use the user's original language to query the documents!
+        If you need several related lookups, pass them together as 'queries' instead of calling the tool repeatedly.
         """)
 
     args_schema: Type[BaseModel] = DocumentSearchInput
+    retrieval: RetrievalConfig = Field(default_factory=RetrievalConfig.from_env)
 
     def _rerank(self, query: str, results: list) -> list:
         """Rerank results by cross-encoder, only changing order and adding score."""
-        if not results:
-            return []
-        
-        pairs = [(query, result["content"]) for result in results]
-        scores = CROSS_ENCODER.predict(pairs)
-        
-        for result, score in zip(results, scores):
-            result["score"] = float(score)
-            
-        # Sort in-place by score descending
-        results.sort(key=lambda r: r["score"], reverse=True)
-        return results
-
-    def _format_results(self, results: list[SearchResult]) -> str:
-        """Format the reranked results, using all available metadata."""
+        return self._rerank_many([query], [results])[0]
+
+    def _rerank_many(self, queries: list[str], groups: list[list]) -> list[list]:
+        """Rerank the results of several queries in a single cross-encoder batch."""
+        pairs = [(query, result["content"]) for query, results in zip(queries, groups) for result in results]
+        scores = iter(get_reranker().score(pairs))
+
+        for results in groups:
+            for result in results:
+                result["score"] = next(scores)
+
+            # Sort in-place by score descending
+            results.sort(key=lambda r: r["score"], reverse=True)
+
+        return groups
+
+    def _rerank_adaptive(self, queries: list[str], groups: list[list]) -> list[list]:
+        """
+        Rerank the candidates of each query, cross-encoding as few as needed.
+
+        In adaptive mode only the first `initial_candidates` of each group
+        (in fusion order) are reranked. A query gets the next
+        `candidate_step` candidates while one of its last `expand_tail`
+        reranked candidates makes it into the top RERANK_TOP_K, or while
+        fewer than RERANK_TOP_K results reach `min_rerank_score`. All
+        queries that expand share one cross-encoder batch per step.
+
+        Returns:
+            The reranked candidates per query, sorted by score descending
+        """
+        config = self.retrieval
+
+        if not config.adaptive:
+            return self._rerank_many(queries, groups)
+
+        sizes = [0] * len(groups)
+        ranked: list[list] = [[] for _ in groups]
+        pending = [number for number, results in enumerate(groups) if results]
+        step = config.initial_candidates
+
+        while pending:
+            batches = [groups[number][sizes[number]:sizes[number] + step] for number in pending]
+            self._rerank_many([queries[number] for number in pending], batches)
+
+            for number, batch in zip(pending, batches):
+                sizes[number] += len(batch)
+                ranked[number] = sorted(ranked[number] + batch, key=lambda r: r["score"], reverse=True)
+
+            pending = [
+                number for number in pending
+                if sizes[number] < len(groups[number]) and self._is_cut_off(groups[number][:sizes[number]], ranked[number])
+            ]
+            step = config.candidate_step
+
+        return ranked
+
+    def _is_cut_off(self, reranked: list, ranked: list) -> bool:
+        """Whether the scores of the candidates reranked so far (in fusion order) suggest expanding."""
+        top = ranked[:RERANK_TOP_K]
+        tail = {id(result) for result in reranked[-self.retrieval.expand_tail:]} if self.retrieval.expand_tail else set()
+
+        if any(id(result) in tail for result in top):
+            return True
+
+        return len(self._above_min_score(top)) < RERANK_TOP_K
+
+    def _above_min_score(self, results: list) -> list:
+        """Reranked results that reach the minimum rerank score."""
+        if self.retrieval.min_rerank_score is None:
+            return results
+        return [result for result in results if result["score"] >= self.retrieval.min_rerank_score]
+
+    def _filter_candidates(self, results: list) -> list:
+        """
+        Drop vector hits more than the configured margin below the best one.
+
+        Candidates that the lexical index found are always kept, they match
+        exact references the embedding does not capture.
+        """
+        vector_scores = [result["vector_score"] for result in results if "vector_score" in result]
+
+        if not vector_scores or self.retrieval.vector_score_margin is None:
+            return results
+
+        threshold = max(vector_scores) - self.retrieval.vector_score_margin
+        return [
+            result for result in results
+            if result.get("lexical") or "vector_score" not in result or result["vector_score"] >= threshold
+        ]
+
+    def _vector_search(self, queries: list[str]) -> list[list[SearchResult]]:
+        """
+        Vector search for all queries, embedding them in one batch.
+
+        Hits below the minimum vector score are dropped before fusion, like
+        the score threshold of the RAG client's search did.
+        """
+        store = get_vector_store()
+        groups = store.search([list(vector) for vector in store.embedding_function(queries)], VECTOR_TOP_K)
+
+        # Reranking replaces the score, keep the vector score for the thresholds
+        for results in groups:
+            for result in results:
+                result["vector_score"] = result["score"]
+
+        return [
+            [result for result in results if result["vector_score"] >= self.retrieval.min_vector_score]
+            for results in groups
+        ]
+
+    def _fuse(self, query: str, vector_results: list[SearchResult]) -> list[SearchResult]:
+        """
+        Merge vector and BM25 candidates with reciprocal rank fusion.
+
+        Without a lexical index, the vector results are returned unchanged.
+        """
+        lexical_index = get_lexical_index()
+
+        if lexical_index is None:
+            return vector_results[:FUSION_TOP_K]
+
+        candidates = {result["id"]: result for result in vector_results}
+        fused = {
+            result["id"]: 1.0 / (RRF_K + rank)
+            for rank, result in enumerate(vector_results, 1)
+        }
+
+        for rank, (chunk_id, _) in enumerate(lexical_index.search(query, LEXICAL_TOP_K), 1):
+            if chunk_id not in candidates:
+                chunk = get_chunk_store().get(chunk_id)
+                if chunk is None:
+                    continue
+                candidates[chunk_id] = {**chunk, "metadata": dict(chunk["metadata"])}
+
+            candidates[chunk_id]["lexical"] = True
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank)
+
+        best = sorted(fused, key=fused.__getitem__, reverse=True)[:FUSION_TOP_K]
+        return [candidates[chunk_id] for chunk_id in best]
+
+    def _format_neighbours(self, result: SearchResult, context_chunks: int) -> str:
+        """Format the chunks around a result, taken from the chunk store."""
+        metadata = result.get('metadata', {})
+        filename = metadata.get('filename')
+        chunk_index = metadata.get('chunk_index')
+
+        if not context_chunks or filename is None or chunk_index is None:
+            return ""
+
         return "".join([
             dedent("""
-                   ## Chunk index {chunk_index} in "{filename}" on page {page_no} (score={score:.2f})
+                   ### Neighbouring chunk index {chunk_index}
 
                    {content}
             """).format(
-                chunk_index=result.get('metadata', {}).get('chunk_index', 'unknown'),
-                filename=result.get('metadata', {}).get('filename', 'unknown'),
-                page_no=result.get('metadata', {}).get('page_no', 'unknown'),
-                score=result.get('score', 0.0),
-                content=result.get('content', '')
-            ) for result in results
+                chunk_index=neighbour.get('metadata', {}).get('chunk_index', 'unknown'),
+                content=neighbour.get('content', '')
+            ) for neighbour in get_chunk_store().window(filename, chunk_index, context_chunks, context_chunks)
         ])
 
-    def _run(self, query: str) -> str:
-        client = get_rag_client()
-        results = client.search(collection_name="knowledge", query=query, limit=VECTOR_TOP_K)
+    def _format_results(self, results: list[SearchResult], seen: Optional[set] = None, context_chunks: int = 0) -> str:
+        """
+        Format the reranked results, using all available metadata.
 
-        if not results:
-            return "No relevant information found."
+        Chunks whose (filename, chunk_index) is already in `seen` are only
+        referenced instead of repeating their content. With `context_chunks`,
+        the neighbouring chunks of each result are attached.
+        """
+        formatted = []
 
-        reranked = self._rerank(query, results)[:RERANK_TOP_K]
-        document_names = set()
+        for result in results:
+            metadata = result.get('metadata', {})
+            chunk_key = (metadata.get('filename'), metadata.get('chunk_index'))
+            repeated = seen is not None and chunk_key in seen
 
-        for result in reranked:
-            name = result.get('metadata', {}).get('title')
+            formatted.append(dedent("""
+                   ## Chunk index {chunk_index} in "{filename}" on page {page_no} (score={score:.2f})
 
-            if name:
-                document_names.add(name)
+                   {content}
+            """).format(
+                chunk_index=metadata.get('chunk_index', 'unknown'),
+                filename=metadata.get('filename', 'unknown'),
+                page_no=metadata.get('page_no', 'unknown'),
+                score=result.get('score', 0.0),
+                content="(see above)" if repeated else result.get('content', '')
+            ))
+
+            if not repeated:
+                formatted.append(self._format_neighbours(result, context_chunks))
+
+            if seen is not None:
+                seen.add(chunk_key)
+
+        return "".join(formatted)
+
+    def _run(self, query: Optional[str] = None, queries: Optional[List[str]] = None, context_chunks: int = 0) -> str:
+        queries = list(dict.fromkeys((queries or []) + ([query] if query else [])))
+
+        if not queries:
+            return "No query given."
+
+        cache = get_search_cache()
+        key = cache.key(
+            json.dumps(queries, ensure_ascii=False),
+            vector_top_k=VECTOR_TOP_K,
+            lexical_top_k=LEXICAL_TOP_K,
+            fusion_top_k=FUSION_TOP_K,
+            rerank_top_k=RERANK_TOP_K,
+            context_chunks=context_chunks,
+            reranker=get_reranker().config.model_id,
+            vector_store=get_vector_store().name,
+            **asdict(self.retrieval),
+        )
+        cached = cache.get(key)
+
+        if cached is not None:
+            return cached
+
+        output = self._search(queries, context_chunks)
+        cache.put(key, output)
+        return output
+
+    def _search(self, queries: list[str], context_chunks: int = 0) -> str:
+        groups = [
+            self._filter_candidates(self._fuse(query, results))
+            for query, results in zip(queries, self._vector_search(queries))
+        ]
+
+        if not any(groups):
+            return "No relevant information found."
 
-        summaries = []
+        reranked = [self._above_min_score(results)[:RERANK_TOP_K] for results in self._rerank_adaptive(queries, groups)]
 
-        for name in document_names:
-            summary_path = f"knowledge/{name}.summary.md"
+        if not any(reranked):
+            return "No relevant information found."
 
-            with open(summary_path, "r", encoding="utf-8") as f:
-                summaries.append(f.read())
+        return self._format_output(queries, reranked, context_chunks)
+
+    def _format_output(self, queries: list[str], reranked: list[list[SearchResult]], context_chunks: int = 0) -> str:
+        """Format the reranked results of all queries with the summaries of the documents involved."""
+        # Titles in order of first appearance, so the output is deterministic
+        document_names = list(dict.fromkeys(
+            name
+            for results in reranked
+            for name in (result.get('metadata', {}).get('title') for result in results) if name
+        ))
+        summaries = get_summary_index().get_many(document_names)
+
+        if len(queries) == 1:
+            chunks = "# Chunks found\n" + self._format_results(reranked[0], context_chunks=context_chunks)
+        else:
+            seen: set = set()
+            chunks = "\n".join(
+                f"# Chunks found for \"{query}\"\n" + (self._format_results(results, seen, context_chunks) or "\nNo relevant information found.\n")
+                for query, results in zip(queries, reranked)
+            )
 
         return dedent(
             """
-            # Chunks found
             {chunks}
 
             # Documents involved
 
             {summaries}
             """).format(
-                chunks=self._format_results(reranked),
+                chunks=chunks,
                 summaries="\n\n".join(summaries)
             )
 
 
 @click.command()
-@click.argument('query', type=click.STRING)
+@click.argument('queries', nargs=-1, required=True, type=click.STRING)
 @click.option('--limit', '-l', default=RERANK_TOP_K, type=click.INT, help='Maximum number of results to return')
-def main(query, limit):
+@click.option('--context', '-C', 'context_chunks', default=0, type=click.INT, help='Number of neighbouring chunks to include per result')
+def main(queries, limit, context_chunks):
     """Search internal documents for relevant information."""
-    print(DocumentSearchTool()._run(query=query))
+    print(DocumentSearchTool()._run(queries=list(queries), context_chunks=context_chunks))
 
 if __name__ == "__main__":
     main()
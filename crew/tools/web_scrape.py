@@ -0,0 +1,101 @@
+"""
+Website scrape tool with a disk cache and concurrent batch mode.
+
+Replaces crewai_tools' `ScrapeWebsiteTool`, which fetches one page at a
+time without caching and returns the text of the whole page, navigation
+and footer included. Pages are fetched through the pooled and cached
+`WebClient` (see `crew.utils.web_cache`): pages requested before are
+served from disk or revalidated with their ETag / Last-Modified header.
+
+With `website_urls`, several pages are fetched concurrently in one call.
+Of every page only the main text is returned: scripts, styles, navigation,
+headers, footers, sidebars and forms are dropped, and the `<main>` or
+`<article>` element is used when the page has one.
+"""
+import re
+from typing import List, Optional, Type, Union
+
+import click
+
+from bs4 import BeautifulSoup
+from textwrap import dedent
+from pydantic import BaseModel, Field, model_validator
+
+from crewai.tools import BaseTool
+
+from crew.utils.web_cache import CachedResponse, get_web_client
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,de;q=0.8",
+}
+
+# Elements that never belong to the main text of a page
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside", "form"]
+
+
+def extract_main_text(html: str) -> str:
+    """Main text of an HTML page, one paragraph per line."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    for element in soup(BOILERPLATE_TAGS):
+        element.decompose()
+
+    root = soup.find("main") or soup.find("article") or soup.body or soup
+    lines = (re.sub(r"\s+", " ", line).strip() for line in root.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class WebScrapeInput(BaseModel):
+    """Input schema for WebScrapeTool"""
+    website_url: Optional[str] = Field(None, description="URL of the website to read")
+    website_urls: Optional[List[str]] = Field(None, description="Several URLs to read at once, fetched concurrently")
+
+    @model_validator(mode="after")
+    def check_url(self):
+        if not self.website_url and not self.website_urls:
+            raise ValueError("Either 'website_url' or 'website_urls' is required")
+        return self
+
+
+class WebScrapeTool(BaseTool):
+    name: str = "scrape_website"
+
+    description: str = dedent(
+        """
+        A tool to read the main text of websites.
+        If you need several pages, pass them together as 'website_urls' instead of calling the tool repeatedly.
+        """)
+
+    args_schema: Type[BaseModel] = WebScrapeInput
+
+    def _format_page(self, url: str, response: Union[CachedResponse, Exception]) -> str:
+        if isinstance(response, Exception):
+            return f"# {url}\n\nThe website could not be read: {response}"
+        if not response.text:
+            return f"# {url}\n\nThe website has no readable text content ({response.content_type or 'unknown type'})."
+
+        text = extract_main_text(response.text) if "html" in response.content_type or not response.content_type else response.text
+        return f"# {url}\n\n{text}"
+
+    def _run(self, website_url: Optional[str] = None, website_urls: Optional[List[str]] = None) -> str:
+        urls = list(dict.fromkeys(([website_url] if website_url else []) + (website_urls or [])))
+
+        if not urls:
+            return "No website URL given."
+
+        responses = get_web_client().get_many(urls, headers=HEADERS)
+
+        pages = [self._format_page(url, response) for url, response in zip(urls, responses)]
+        return "The following text is scraped website content:\n\n" + "\n\n---\n\n".join(pages)
+
+
+@click.command()
+@click.argument('urls', nargs=-1, required=True, type=click.STRING)
+def main(urls):
+    """Read the main text of websites."""
+    print(WebScrapeTool()._run(website_urls=list(urls)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Web search tool backed by the Serper API with a disk cache.
+
+Same queries and results as crewai_tools' `SerperDevTool`, but the API
+requests go through the pooled and cached `WebClient` (see
+`crew.utils.web_cache`), so a query that was already searched in this or
+an earlier run within the cache TTL costs neither time nor Serper credits.
+
+`SERPER_BASE_URL` points the tool to another endpoint, e.g. the local
+stand-in in `crew.utils.web_stub`.
+"""
+import os
+from typing import Any, Dict
+
+import click
+import json
+
+from crewai_tools import SerperDevTool
+
+from crew.utils.web_cache import get_web_client
+
+
+class WebSearchTool(SerperDevTool):
+    name: str = "web_search"
+    base_url: str = os.getenv("SERPER_BASE_URL", "https://google.serper.dev")
+
+    def _make_api_request(self, search_query: str, search_type: str) -> Dict[str, Any]:
+        """Serper API request, served from the web cache when possible."""
+        payload: Dict[str, Any] = {"q": search_query, "num": self.n_results}
+
+        if self.country:
+            payload["gl"] = self.country
+        if self.location:
+            payload["location"] = self.location
+        if self.locale:
+            payload["hl"] = self.locale
+
+        headers = {
+            "X-API-KEY": os.environ["SERPER_API_KEY"],
+            "content-type": "application/json",
+        }
+
+        results = get_web_client().post_json(self._get_search_url(search_type), payload, headers=headers)
+        if not results:
+            raise ValueError("Empty response from Serper API")
+
+        return results
+
+
+@click.command()
+@click.argument('query', type=click.STRING)
+@click.option('--type', 'search_type', default="search", type=click.Choice(["search", "news"]), help='Search type')
+def main(query: str, search_type: str):
+    """Search the web."""
+    print(json.dumps(WebSearchTool()._run(search_query=query, search_type=search_type), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
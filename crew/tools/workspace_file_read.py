@@ -1,11 +1,18 @@
-from typing import Any
+from typing import Optional
 from crewai.tools import BaseTool
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import os
 from textwrap import dedent
 
+from crew.utils.workspace import WORKSPACE_DIR, find_section, headings
+
 class WorkspaceFileReadToolInput(BaseModel):
     filename: str
+    start_line: Optional[int] = Field(None, ge=1, description="First line to read, starting at 1")
+    end_line: Optional[int] = Field(None, ge=1, description="Last line to read (inclusive)")
+    start_byte: Optional[int] = Field(None, ge=0, description="First byte to read, starting at 0")
+    end_byte: Optional[int] = Field(None, ge=0, description="Byte to stop reading at (exclusive)")
+    heading: Optional[str] = Field(None, description="Only read the Markdown section with this heading, e.g. '## Risiken'")
 
 class WorkspaceFileReadTool(BaseTool):
     name: str = "workspace_file_read"
@@ -14,16 +21,46 @@ class WorkspaceFileReadTool(BaseTool):
         """
         A tool to read content from a specified file.
         Accepts filename as input.
+        To read only a part of a large file, pass either a line range (start_line, end_line),
+        a byte range (start_byte, end_byte) or the heading of a Markdown section.
         """)
 
     args_schema: type[BaseModel] = WorkspaceFileReadToolInput
 
-    def _run(self, filename: str) -> str:
-        directory = "./workspace"
+    def _run(
+        self,
+        filename: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        start_byte: Optional[int] = None,
+        end_byte: Optional[int] = None,
+        heading: Optional[str] = None,
+    ) -> str:
+        directory = str(WORKSPACE_DIR)
         filepath = os.path.join(directory, filename)
         try:
-            with open(filepath, "r") as file:
+            if start_byte is not None or end_byte is not None:
+                with open(filepath, "rb") as file:
+                    file.seek(start_byte or 0)
+                    data = file.read() if end_byte is None else file.read(max(0, end_byte - (start_byte or 0)))
+                return data.decode("utf-8", errors="replace")
+
+            with open(filepath, "r", encoding="utf-8") as file:
                 content = file.read()
+
+            if heading:
+                span = find_section(content, heading)
+                if span is None:
+                    available = "\n".join(f"{'#' * level} {title}" for level, title, _ in headings(content))
+                    return f"Section '{heading}' not found in {filepath}. Available headings:\n{available}"
+                return content[span[0]:span[1]]
+
+            if start_line is not None or end_line is not None:
+                lines = content.splitlines(keepends=True)
+                first = start_line or 1
+                last = min(end_line or len(lines), len(lines))
+                return f"[Lines {first}-{last} of {len(lines)} in {filename}]\n" + "".join(lines[first - 1:last])
+
             return content
         except FileNotFoundError:
             return f"File {filepath} does not exist."
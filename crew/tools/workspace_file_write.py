@@ -1,40 +1,100 @@
 import os
 
+from typing import Literal, Optional
 from crewai.tools import BaseTool
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from pathlib import Path
 from textwrap import dedent
 
+from crew.utils.workspace import WORKSPACE_DIR, atomic_write, find_section
+
+def _append(existing: str, content: str) -> str:
+    """Append content to existing text, separated by a blank line."""
+    if not existing or existing.endswith("\n\n"):
+        return existing + content
+    return existing + ("\n" if existing.endswith("\n") else "\n\n") + content
+
 class WorkspaceFileWriteToolInput(BaseModel):
     filename: str
     content: str
+    mode: Literal["overwrite", "append", "replace_section", "patch"] = Field(
+        "overwrite", description="How to write the content, see the tool description")
+    heading: Optional[str] = Field(None, description="Heading of the section to replace, for mode 'replace_section'")
+    old_text: Optional[str] = Field(None, description="Exact text to replace with the content, for mode 'patch'")
 
 class WorkspaceFileWriteTool(BaseTool):
     name: str = "workspace_file_write"
 
     description: str = dedent("""
         A tool to write text content to a specified file.
-        Always overwrites existing files.
         Accepts filename and content as input.
         Only plain text content is supported. Do not use for binary or non-text files.
+        Modes:
+        - overwrite (default): replace the whole file with the content
+        - append: add the content to the end of the file
+        - replace_section: replace the Markdown section with the given heading (including the heading line) with the content, appends it if the section does not exist
+        - patch: replace old_text, which must occur exactly once in the file, with the content
+        Prefer append, replace_section and patch over rewriting an existing file.
     """)
 
     args_schema: type[BaseModel] = WorkspaceFileWriteToolInput
 
-    def _run(self, filename: str, content: str) -> str:
-        directory = "./workspace"
+    def _run(
+        self,
+        filename: str,
+        content: str,
+        mode: str = "overwrite",
+        heading: Optional[str] = None,
+        old_text: Optional[str] = None,
+    ) -> str:
+        directory = str(WORKSPACE_DIR)
 
         try:
             filepath = os.path.join(directory, filename)
 
-            # Create all parent directories for the file if they don't exist
-            parent_dir = os.path.dirname(filepath)
-            if parent_dir and not os.path.exists(parent_dir):
-                os.makedirs(parent_dir, exist_ok=True)
+            if mode == "overwrite":
+                atomic_write(Path(filepath), content)
+                return f"Content successfully written to {filepath} (overwritten if existed)"
+
+            try:
+                with open(filepath, "r", encoding="utf-8") as file:
+                    existing = file.read()
+            except FileNotFoundError:
+                existing = ""
+
+            if mode == "append":
+                atomic_write(Path(filepath), _append(existing, content))
+                return f"Content successfully appended to {filepath}"
+
+            if mode == "replace_section":
+                if not heading:
+                    return "The heading of the section to replace is required for mode 'replace_section'."
+
+                if not content.endswith("\n"):
+                    content += "\n"
+
+                span = find_section(existing, heading)
+                if span is None:
+                    atomic_write(Path(filepath), _append(existing, content))
+                    return f"Section '{heading}' not found, content appended to {filepath}"
+
+                # Keep the blank line that separated the section from the next one
+                if span[1] < len(existing) and not content.endswith("\n\n"):
+                    content += "\n"
+                atomic_write(Path(filepath), existing[:span[0]] + content + existing[span[1]:])
+                return f"Section '{heading}' successfully replaced in {filepath}"
+
+            if mode == "patch":
+                if not old_text:
+                    return "The text to replace is required for mode 'patch'."
+
+                occurrences = existing.count(old_text)
+                if occurrences != 1:
+                    return f"The text to replace occurs {occurrences} times in {filepath}, it must occur exactly once. Include more surrounding text."
 
-            # Always overwrite
-            with open(filepath, "w") as file:
-                file.write(content)
+                atomic_write(Path(filepath), existing.replace(old_text, content, 1))
+                return f"Patch successfully applied to {filepath}"
 
-            return f"Content successfully written to {filepath} (overwritten if existed)"
+            return f"Unknown mode '{mode}'."
         except Exception as e:
             return f"An error occurred while writing to the file: {e!s}"
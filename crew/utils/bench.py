@@ -0,0 +1,358 @@
+"""
+Ingestion and retrieval benchmarks.
+
+All benchmarks run offline against the local vector store and the files in
+`knowledge/`, so changes to `ChunkingConfig`, the retrieval constants of the
+document search or the reranker can be compared run by run.
+
+- Ingestion converts, chunks, embeds and upserts a sample of the knowledge
+  files into a separate collection and reports the throughput of each stage,
+  including loading the converted documents from the document cache. The
+  upsert, vector queries and neighbour window lookups are timed for every
+  vector store backend.
+- Retrieval runs a fixed set of labelled German queries through the stages
+  of `DocumentSearchTool` and reports p50/p95 latencies per stage together
+  with recall@k and MRR against the labelled documents.
+- Reranker compares the PyTorch, ONNX and int8 ONNX cross-encoder on the
+  candidates of the same queries: latency, throughput and score drift.
+"""
+
+import time
+import asyncio
+import tempfile
+import logging
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence
+
+import yaml
+
+from crew.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+BENCH_COLLECTION = "knowledge_bench"
+DEFAULT_QUERIES = Path("bench/queries.yaml")
+
+
+class StageTimer:
+    """Collects wall-clock durations per named stage."""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.setdefault(stage, []).append(time.perf_counter() - start)
+
+    def total(self, stage: str) -> float:
+        return sum(self.durations.get(stage, []))
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """p50, p95 and mean of durations, in milliseconds."""
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "mean_ms": (sum(values) / len(values) * 1000) if values else 0.0,
+    }
+
+
+def _scalar_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata reduced to the scalar types the vector store accepts."""
+    return {
+        key: value if isinstance(value, (str, float, bool)) or (isinstance(value, int) and abs(value) < 2**63) else str(value)
+        for key, value in metadata.items()
+        if value is not None
+    }
+
+
+def run_ingestion_bench(
+    paths: List[str],
+    workers: int = 1,
+    batch_size: int = 64,
+    vector_stores: Sequence[str] = ("chroma",),
+    lookups: int = 50,
+) -> Dict[str, Any]:
+    """
+    Import `paths` into a scratch collection, timing each stage separately.
+
+    Stages run one after another over all files, so their throughput is not
+    blurred by the overlap of the streaming import. The same chunks are then
+    upserted into every backend of `vector_stores`, which is queried with
+    `lookups` of the chunk embeddings and asked for the window of two chunks
+    around as many chunks.
+    """
+    from crew.utils.chunker import ChunkingConfig, create_chunker
+    from crew.utils.conversion import convert_documents
+    from crew.utils.document_cache import DocumentCache
+    from crew.utils.vector_store import VectorStoreConfig, create_vector_store
+
+    timer = StageTimer()
+    config = VectorStoreConfig.from_env()
+    stores = [create_vector_store(replace(config, backend=backend), BENCH_COLLECTION) for backend in vector_stores]
+
+    with timer.measure("conversion"):
+        documents = [doc for _, doc in convert_documents(paths, workers=workers)]
+
+    # What a re-chunk costs instead of the conversion
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DocumentCache(Path(cache_dir))
+        for number, doc in enumerate(documents):
+            cache.store(str(number), doc)
+
+        with timer.measure("cache_load"):
+            documents = [cache.load(str(number)) for number in range(len(documents))]  # type: ignore[misc]
+
+    chunker = create_chunker(ChunkingConfig())
+    chunks = []
+
+    with timer.measure("chunking"):
+        for doc in documents:
+            chunks.extend(asyncio.run(chunker.chunk_document(
+                doc.export_to_markdown(),
+                doc.name,
+                doc.origin.filename,
+                doc.origin.model_dump(),
+                doc,  # type: ignore
+            )))
+
+    texts = [chunk.content for chunk in chunks]
+    embeddings: List[Any] = []
+
+    with timer.measure("embedding"):
+        embedding_function = stores[0].embedding_function if stores else create_vector_store(config).embedding_function
+        for start in range(0, len(texts), batch_size):
+            embeddings.extend(list(vector) for vector in embedding_function(texts[start:start + batch_size]))
+
+    ids = [f"{chunk.metadata.get('title')}:{chunk.index}" for chunk in chunks]
+    metadatas = [_scalar_metadata({"chunk_index": chunk.index, **chunk.metadata}) for chunk in chunks]
+    sample = list(range(0, len(chunks), max(1, len(chunks) // lookups)))[:lookups]
+    backends: Dict[str, Any] = {}
+
+    for store in stores:
+        try:
+            store.drop()
+        except Exception as e:
+            logger.debug(f"Bench collection deletion failed: {e}")
+
+        store.create()
+        store_timer = StageTimer()
+
+        try:
+            with store_timer.measure("upsert"):
+                for start in range(0, len(chunks), batch_size):
+                    end = start + batch_size
+                    store.upsert(ids[start:end], texts[start:end], metadatas[start:end], embeddings[start:end])
+
+            for number in sample:
+                with store_timer.measure("query"):
+                    store.search([embeddings[number]], 10)
+
+                filename = metadatas[number].get("filename")
+                if filename is None:
+                    continue
+                with store_timer.measure("window"):
+                    store.window(filename, max(0, chunks[number].index - 2), chunks[number].index + 2)
+        finally:
+            store.drop()
+
+        upsert_seconds = store_timer.total("upsert")
+        backends[store.name] = {
+            "indexed": store.indexed,
+            "upsert_seconds": upsert_seconds,
+            "chunks_per_second": len(chunks) / upsert_seconds if upsert_seconds else 0.0,
+            "query": latency_summary(store_timer.durations.get("query", [])),
+            "window": latency_summary(store_timer.durations.get("window", [])),
+        }
+
+    pages = sum(doc.num_pages() for doc in documents)
+    counts = {"conversion": len(documents), "cache_load": len(documents), "chunking": len(chunks), "embedding": len(chunks)}
+    units = {"conversion": "documents", "cache_load": "documents", "chunking": "chunks", "embedding": "chunks"}
+
+    stages = {}
+    for stage, count in counts.items():
+        seconds = timer.total(stage)
+        stages[stage] = {
+            "seconds": seconds,
+            units[stage]: count,
+            f"{units[stage]}_per_second": count / seconds if seconds else 0.0,
+        }
+    stages["conversion"]["pages"] = pages
+    stages["conversion"]["pages_per_second"] = pages / stages["conversion"]["seconds"] if stages["conversion"]["seconds"] else 0.0
+
+    return {"files": len(paths), "workers": workers, "batch_size": batch_size, "stages": stages, "vector_stores": backends}
+
+
+def load_queries(path: Path = DEFAULT_QUERIES) -> List[Dict[str, Any]]:
+    """Load the labelled queries: a list of {query, relevant: [filenames]}."""
+    return yaml.safe_load(path.read_text(encoding="utf-8"))["queries"]
+
+
+def run_retrieval_bench(queries: List[Dict[str, Any]], k: int = 5, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Run labelled queries through the stages of the document search.
+
+    The search cache and the cached rerank scores are bypassed. The first round warms up the models and
+    stores and is used for the quality metrics, only the following `repeat`
+    rounds are timed.
+
+    The warm-up round also calibrates the thresholds of `RetrievalConfig`:
+    the chunks of relevant files that make it into the top k bound the
+    minimum vector score, the margin below the best vector score and the
+    minimum rerank score that would still keep all of them.
+    """
+    from crew.tools.document_search import RERANK_TOP_K, DocumentSearchTool
+    from crew.utils.inference_cache import get_inference_cache
+
+    tool = DocumentSearchTool()
+    timer = StageTimer()
+    recalls: List[float] = []
+    reciprocal_ranks: List[float] = []
+    reranked_pairs: List[int] = []
+    per_query = []
+    relevant_hits: List[Dict[str, float]] = []
+
+    with get_inference_cache().bypass():
+        for round_number in range(repeat + 1):
+            warmup = round_number == 0
+
+            for labelled in queries:
+                query = labelled["query"]
+                relevant = set(labelled["relevant"])
+                stage_timer = StageTimer() if warmup else timer
+
+                with stage_timer.measure("total"):
+                    with stage_timer.measure("vector"):
+                        vector_results = tool._vector_search([query])[0]
+                    with stage_timer.measure("fusion"):
+                        fused = tool._fuse(query, vector_results)
+                        candidates = tool._filter_candidates(fused)
+                    with stage_timer.measure("rerank"):
+                        reranked = tool._rerank_adaptive([query], [candidates])[0]
+                        selected = tool._above_min_score(reranked)
+                    with stage_timer.measure("formatting"):
+                        tool._format_output([query], [selected[:RERANK_TOP_K]])
+
+                if not warmup:
+                    continue
+
+                # Relevance is labelled per file: a chunk is a hit if its file is relevant
+                ranked_files = [result.get("metadata", {}).get("filename") for result in selected]
+                found = relevant & set(ranked_files[:k])
+                first_hit = next((rank for rank, name in enumerate(ranked_files, 1) if name in relevant), None)
+                best_vector_score = max((result["vector_score"] for result in fused if "vector_score" in result), default=0.0)
+
+                recalls.append(len(found) / len(relevant) if relevant else 0.0)
+                reciprocal_ranks.append(1 / first_hit if first_hit else 0.0)
+                reranked_pairs.append(len(reranked))
+                relevant_hits.extend(
+                    {
+                        "vector_score": result["vector_score"],
+                        "vector_gap": best_vector_score - result["vector_score"],
+                        "rerank_score": result["score"],
+                    }
+                    for result in selected[:k]
+                    if result.get("metadata", {}).get("filename") in relevant and "vector_score" in result and not result.get("lexical")
+                )
+                per_query.append({
+                    "query": query,
+                    "recall": recalls[-1],
+                    "reciprocal_rank": reciprocal_ranks[-1],
+                    "reranked_pairs": len(reranked),
+                    "top_files": list(dict.fromkeys(ranked_files[:k])),
+                })
+
+    return {
+        "queries": len(queries),
+        "repeat": repeat,
+        "k": k,
+        f"recall@{k}": sum(recalls) / len(recalls) if recalls else 0.0,
+        "mrr": sum(reciprocal_ranks) / len(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        "reranked_pairs_per_query": sum(reranked_pairs) / len(reranked_pairs) if reranked_pairs else 0.0,
+        "calibration": {
+            "min_vector_score": min((hit["vector_score"] for hit in relevant_hits), default=None),
+            "vector_score_margin": max((hit["vector_gap"] for hit in relevant_hits), default=None),
+            "min_rerank_score": min((hit["rerank_score"] for hit in relevant_hits), default=None),
+        },
+        "latency": {stage: latency_summary(values) for stage, values in timer.durations.items()},
+        "per_query": per_query,
+    }
+
+
+def _top_indices(scores: List[float], k: int) -> set:
+    """Positions of the k highest scores."""
+    return set(sorted(range(len(scores)), key=lambda i: -scores[i])[:k])
+
+
+def run_reranker_bench(queries: List[Dict[str, Any]], backends: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Compare the reranker backends on the candidates of the labelled queries.
+
+    The candidates are retrieved once and scored by every backend with the
+    model directly, without the request batching of the shared reranker.
+    Per backend it reports the load time (including a first ONNX export),
+    the p50/p95 latency per query, the pairs scored per second and the
+    score drift and top-k agreement against PyTorch.
+    """
+    from crew.tools.document_search import RERANK_TOP_K, DocumentSearchTool
+    from crew.utils.reranker import RerankerConfig, load_cross_encoder, score_drift
+
+    tool = DocumentSearchTool()
+    groups = [
+        [(labelled["query"], candidate["content"]) for candidate in tool._fuse(labelled["query"], tool._vector_search([labelled["query"]])[0])]
+        for labelled in queries
+    ]
+    pair_count = sum(len(pairs) for pairs in groups)
+    base_config = RerankerConfig.from_env()
+    baseline: List[List[float]] = []
+    results: Dict[str, Any] = {}
+
+    # PyTorch first, it is the baseline for the drift
+    for backend in sorted(set(backends) | {"torch"}, key=lambda b: b != "torch"):
+        config = replace(base_config, backend=backend)
+        timer = StageTimer()
+
+        try:
+            with timer.measure("load"):
+                model = load_cross_encoder(config)
+        except Exception as e:
+            logger.error(f"Reranker backend {backend} failed to load: {e}")
+            results[backend] = {"error": str(e)}
+            continue
+
+        # Warm-up round, its scores are compared against the baseline
+        scores = [[float(s) for s in model.predict(pairs, batch_size=config.batch_size)] if pairs else [] for pairs in groups]
+
+        for _ in range(repeat):
+            for pairs in groups:
+                if pairs:
+                    with timer.measure("query"):
+                        model.predict(pairs, batch_size=config.batch_size)
+
+        seconds = timer.total("query")
+        results[backend] = {
+            "load_seconds": timer.total("load"),
+            "latency": latency_summary(timer.durations.get("query", [])),
+            "pairs_per_second": pair_count * repeat / seconds if seconds else 0.0,
+        }
+
+        if backend == "torch":
+            baseline = scores
+            continue
+
+        top_k_agreement = [_top_indices(a, RERANK_TOP_K) == _top_indices(b, RERANK_TOP_K) for a, b in zip(baseline, scores)]
+        results[backend].update(score_drift([s for group in baseline for s in group], [s for group in scores for s in group]))
+        results[backend][f"top{RERANK_TOP_K}_agreement"] = sum(top_k_agreement) / len(top_k_agreement) if top_k_agreement else 0.0
+
+    torch_pairs_per_second = results.get("torch", {}).get("pairs_per_second")
+    for stats in results.values():
+        if torch_pairs_per_second and stats.get("pairs_per_second"):
+            stats["speedup"] = stats["pairs_per_second"] / torch_pairs_per_second
+
+    return {"queries": len(queries), "pairs": pair_count, "repeat": repeat, "backends": results}
@@ -0,0 +1,250 @@
+"""
+Task checkpoints for resumable crew runs.
+
+A kickoff that fails late, e.g. in `quality_assurance_review`, otherwise
+has to start over at `initial_intake_processing`, web research included.
+After every completed task its output is stored together with a
+fingerprint of everything the output was derived from:
+
+- the task itself: description, expected output, agent, LLM and tools,
+- the fingerprints of its context tasks,
+- the workspace files it reads or writes (`reads:` and `writes:` in
+  tasks.yaml): their content at the start of the run and the fingerprints
+  of the earlier tasks writing them,
+- the knowledge collection version, if the task searches the documents.
+
+`kickoff --resume` skips every task whose fingerprint is unchanged and
+restores its output for the tasks that depend on it. Tasks with a changed
+fingerprint, without a checkpoint or depending on such a task run again.
+
+Workspace files are rewritten by the tasks themselves, so a file only
+counts as edited if it differs from its content at the end of the last run.
+Editing `intake.md` then invalidates every task working with it, editing a
+late-stage prompt only that task and the ones after it.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+from crewai import Task, TaskOutput
+from crewai.tasks.output_format import OutputFormat
+
+from crew.utils.manifest import hash_file, read_collection_version
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_DIR = Path("workspace")
+KNOWLEDGE_DIR = Path("knowledge")
+CHECKPOINT_FILENAME = ".checkpoints.json"
+CHECKPOINT_VERSION = 1
+
+# Tools whose results depend on the imported knowledge
+KNOWLEDGE_TOOLS = {"document_search", "document_chunk_context"}
+
+
+def _hash_workspace_file(path: Path) -> Optional[str]:
+    try:
+        return hash_file(path)
+    except FileNotFoundError:
+        return None
+
+
+def _digest(payload: Any) -> str:
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _tool_names(task: Task) -> List[str]:
+    tools = list(task.tools or []) + list(getattr(task.agent, "tools", None) or [])
+    return sorted({tool.name for tool in tools})
+
+
+class TaskCheckpoints:
+    """
+    Stores task outputs with the fingerprint of their inputs and decides
+    which tasks of a run have to be executed.
+    """
+
+    def __init__(self, workspace_dir: Path = WORKSPACE_DIR, resume: bool = False):
+        self.workspace_dir = workspace_dir
+        self.path = workspace_dir / CHECKPOINT_FILENAME
+        self.resume = resume
+        self.pending: List[Task] = []
+        self.skipped: List[Task] = []
+        self._tasks: Dict[str, Task] = {}
+        self._writes: Dict[str, List[str]] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._state: Dict[str, Any] = {"version": CHECKPOINT_VERSION, "sources": {}, "files": {}, "tasks": {}}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable checkpoints {self.path}: {e}")
+            return {}
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"Ignoring checkpoints with an outdated format: {self.path}")
+            return {}
+
+        return state
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self._state, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def _signature(self, task: Task) -> Dict[str, Any]:
+        """Everything of the task's configuration that shapes its output."""
+        agent = task.agent
+        llm = getattr(agent, "llm", None)
+
+        return {
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "agent": {
+                "role": getattr(agent, "role", None),
+                "goal": getattr(agent, "goal", None),
+                "backstory": getattr(agent, "backstory", None),
+                "llm": getattr(llm, "model", None) if llm is not None and not isinstance(llm, str) else llm,
+            },
+            "tools": _tool_names(task),
+            "output_pydantic": task.output_pydantic.__name__ if task.output_pydantic else None,
+        }
+
+    def plan(self, tasks: List[Task], tasks_config: Mapping[str, Mapping[str, Any]]) -> List[Task]:
+        """
+        Fingerprint the tasks and select the ones that have to run.
+
+        Args:
+            tasks: Tasks in declaration order
+            tasks_config: Task configuration by name, as loaded from tasks.yaml
+
+        Returns:
+            The tasks to execute. Skipped tasks have their output restored.
+        """
+        previous = self._load() if self.resume else {}
+        previous_sources = previous.get("sources", {})
+        previous_files = previous.get("files", {})
+        previous_tasks = previous.get("tasks", {})
+
+        inputs: Dict[str, List[str]] = {}
+        for task in tasks:
+            config = tasks_config.get(task.name, {})
+            self._tasks[task.name] = task
+            self._writes[task.name] = list(config.get("writes") or [])
+            inputs[task.name] = sorted(set(config.get("reads") or []) | set(self._writes[task.name]))
+
+        # Content of the workspace files at the start of the run. A file that is
+        # unchanged since the end of the last run still has its original source.
+        current: Dict[str, Optional[str]] = {}
+        sources: Dict[str, Optional[str]] = {}
+        for filename in sorted({name for names in inputs.values() for name in names}):
+            current[filename] = _hash_workspace_file(self.workspace_dir / filename)
+            if filename in previous_files and previous_files[filename] == current[filename]:
+                sources[filename] = previous_sources.get(filename)
+            else:
+                sources[filename] = current[filename]
+
+        collection_version = read_collection_version(KNOWLEDGE_DIR)
+        writers: Dict[str, List[str]] = {}
+        pending: Set[str] = set()
+
+        for number, task in enumerate(tasks):
+            # Without explicit context CrewAI passes the outputs of all earlier tasks
+            context = [context_task.name for context_task in task.context] if isinstance(task.context, list) else [
+                earlier.name for earlier in tasks[:number]]
+            files = {
+                filename: [sources[filename], [self._fingerprints[writer] for writer in writers.get(filename, [])]]
+                for filename in inputs[task.name]
+            }
+            prerequisites = set(context) | {writer for filename in inputs[task.name] for writer in writers.get(filename, [])}
+
+            fingerprint = _digest({
+                "task": self._signature(task),
+                "context": [self._fingerprints.get(name) for name in context],
+                "files": files,
+                "knowledge": collection_version if KNOWLEDGE_TOOLS & set(_tool_names(task)) else None,
+            })
+            self._fingerprints[task.name] = fingerprint
+
+            checkpoint = previous_tasks.get(task.name)
+            if checkpoint is None or checkpoint.get("fingerprint") != fingerprint or prerequisites & pending:
+                pending.add(task.name)
+            else:
+                task.output = self._restore(task, checkpoint["output"])
+
+            for filename in self._writes[task.name]:
+                writers.setdefault(filename, []).append(task.name)
+
+        self.pending = [task for task in tasks if task.name in pending]
+        self.skipped = [task for task in tasks if task.name not in pending]
+
+        self._state = {
+            "version": CHECKPOINT_VERSION,
+            "sources": sources,
+            "files": current,
+            "tasks": {name: checkpoint for name, checkpoint in previous_tasks.items() if name not in pending},
+        }
+        self._save()
+
+        if self.skipped:
+            logger.info(f"Resuming with checkpoints of {', '.join(task.name for task in self.skipped)}")
+
+        return self.pending
+
+    def record(self, output: TaskOutput):
+        """Store the output of a completed task, used as the crew's task callback."""
+        task = self._tasks.get(output.name or "")
+        if task is None:
+            logger.warning(f"No checkpoint for unknown task {output.name}")
+            return
+
+        with self._lock:
+            for filename in self._writes[task.name]:
+                self._state["files"][filename] = _hash_workspace_file(self.workspace_dir / filename)
+
+            self._state["tasks"][task.name] = {
+                "fingerprint": self._fingerprints[task.name],
+                "completed": time.time(),
+                "output": {
+                    "raw": output.raw,
+                    "pydantic": output.pydantic.model_dump(mode="json") if output.pydantic else None,
+                    "json_dict": output.json_dict,
+                    "agent": output.agent,
+                    "output_format": output.output_format.value,
+                },
+            }
+            self._save()
+
+    def _restore(self, task: Task, output: Dict[str, Any]) -> TaskOutput:
+        pydantic = None
+        if output.get("pydantic") is not None and task.output_pydantic:
+            pydantic = task.output_pydantic.model_validate(output["pydantic"])
+
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=output.get("raw", ""),
+            pydantic=pydantic,
+            json_dict=output.get("json_dict"),
+            agent=output.get("agent", ""),
+            output_format=OutputFormat(output.get("output_format", OutputFormat.RAW.value)),
+        )
+
+    def final_output(self) -> Optional[TaskOutput]:
+        """Output of the last task, if it was restored from a checkpoint."""
+        if self.pending or not self.skipped:
+            return None
+        return self.skipped[-1].output
@@ -0,0 +1,140 @@
+"""
+In-memory chunk store for neighbourhood lookups.
+
+Agents look at the chunks around every search hit. Fetching them with a
+metadata-filtered `get` scans the collection on every call, although the
+chunks of a document never change between imports. The store loads all
+chunks of the "knowledge" collection once, keeps them per document in a
+list indexed by `chunk_index`, and answers context windows with a slice.
+
+It reloads when `import-knowledge` bumps the collection version. With a
+vector store that has payload indexes (a Qdrant server, see
+`crew.utils.vector_store`), windows and ids are looked up in the store
+instead, so the chunks are not held in memory.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crew.utils.manifest import CollectionVersionWatcher
+from crew.utils.vector_store import VectorStore, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = Path("knowledge")
+
+Chunk = Dict[str, Any]
+
+
+class ChunkStore:
+    """
+    Chunks of the "knowledge" collection by id and by filename and chunk index.
+    """
+
+    def __init__(self, knowledge_dir: Path = KNOWLEDGE_DIR, store: Optional[VectorStore] = None):
+        self._store = store
+        self._documents: Dict[str, List[Optional[Chunk]]] = {}
+        self._by_id: Dict[str, Chunk] = {}
+        self._version: Optional[str] = None
+        self._version_watcher = CollectionVersionWatcher(knowledge_dir)
+        self._lock = threading.Lock()
+
+    def window(
+        self,
+        filename: str,
+        chunk_index: int,
+        before: int = 0,
+        after: int = 0,
+        include_center: bool = False,
+    ) -> List[Chunk]:
+        """
+        Chunks around `chunk_index` of a document, in index order.
+
+        Args:
+            filename: Filename of the document
+            chunk_index: Central chunk index
+            before: Number of chunks before the central chunk
+            after: Number of chunks after the central chunk
+            include_center: Whether to include the central chunk itself
+
+        Returns:
+            Chunks as dicts with "id", "content" and "metadata"
+        """
+        start = max(0, chunk_index - before)
+
+        if self.store.indexed:
+            window = self.store.window(filename, start, chunk_index + after)
+            return [chunk for chunk in window if include_center or chunk["metadata"].get("chunk_index") != chunk_index]
+
+        self._load_if_changed()
+        chunks = self._documents.get(filename, [])
+        window = chunks[start:chunk_index + after + 1]  # type: ignore[assignment]
+
+        return [
+            chunk for offset, chunk in enumerate(window, start)
+            if chunk is not None and (include_center or offset != chunk_index)
+        ]
+
+    def get(self, chunk_id: str) -> Optional[Chunk]:
+        """Chunk with the given id, None if it is not in the collection."""
+        if self.store.indexed:
+            return next(iter(self.store.get([chunk_id])), None)
+
+        self._load_if_changed()
+        return self._by_id.get(chunk_id)
+
+    @property
+    def store(self) -> VectorStore:
+        if self._store is None:
+            self._store = get_vector_store()
+        return self._store
+
+    def load(self):
+        """Load all chunks of the collection."""
+        documents: Dict[str, List[Optional[Chunk]]] = {}
+        by_id: Dict[str, Chunk] = {}
+
+        for chunk_id, content, metadata in self.store.iter_chunks():
+            chunk = {"id": chunk_id, "content": content, "metadata": dict(metadata or {})}
+            by_id[chunk_id] = chunk
+            filename = chunk["metadata"].get("filename")
+            chunk_index = chunk["metadata"].get("chunk_index")
+
+            if filename is None or chunk_index is None:
+                continue
+
+            chunks = documents.setdefault(filename, [])
+            if len(chunks) <= chunk_index:
+                chunks.extend([None] * (chunk_index + 1 - len(chunks)))
+            chunks[chunk_index] = chunk
+
+        self._documents = documents
+        self._by_id = by_id
+        logger.info(f"Chunk store loaded {len(by_id)} chunks of {len(documents)} documents")
+
+    def _load_if_changed(self):
+        version = self._version_watcher.current()
+
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self.load()
+                    self._version = version
+
+
+_CHUNK_STORE: Optional[ChunkStore] = None
+_CHUNK_STORE_LOCK = threading.Lock()
+
+
+def get_chunk_store() -> ChunkStore:
+    """Return the process-wide chunk store."""
+    global _CHUNK_STORE
+
+    if _CHUNK_STORE is None:
+        with _CHUNK_STORE_LOCK:
+            if _CHUNK_STORE is None:
+                _CHUNK_STORE = ChunkStore()
+
+    return _CHUNK_STORE
@@ -51,16 +51,15 @@ class ChunkingConfig:
             raise ValueError("Minimum chunk size must be positive")
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
-    """Represents a document chunk with optional embedding."""
+    """Represents a document chunk."""
     content: str
     index: int
     start_char: int
     end_char: int
     metadata: Dict[str, Any]
     token_count: Optional[int] = None
-    embedding: Optional[List[float]] = None  # For embedder compatibility
 
     def __post_init__(self):
         """Calculate token count if not provided."""
@@ -103,6 +102,19 @@ class DoclingHybridChunker:
 
         logger.info(f"HybridChunker initialized (max_tokens={config.max_tokens})")
 
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Count the tokens of all texts in a single batched tokenizer call."""
+        if not texts:
+            return []
+
+        encodings = self.tokenizer(
+            texts,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        return [len(input_ids) for input_ids in encodings["input_ids"]]
+
     async def chunk_document(
         self,
         content: str,
@@ -147,17 +159,17 @@ class DoclingHybridChunker:
             chunk_iter = self.chunker.chunk(dl_doc=docling_doc)
             chunks = list(chunk_iter)
 
+            # Get contextualized texts (include heading hierarchy)
+            contextualized_texts = [self.chunker.contextualize(chunk=chunk) for chunk in chunks]
+
+            # Count actual tokens, all chunks at once
+            token_counts = self._count_tokens(contextualized_texts)
+
             # Convert Docling chunks to DocumentChunk objects
             document_chunks = []
             current_pos = 0
 
-            for i, chunk in enumerate(chunks):
-                # Get contextualized text (includes heading hierarchy)
-                contextualized_text = self.chunker.contextualize(chunk=chunk)
-
-                # Count actual tokens
-                token_count = len(self.tokenizer.encode(contextualized_text))
-
+            for i, (chunk, contextualized_text, token_count) in enumerate(zip(chunks, contextualized_texts, token_counts)):
                 # Create chunk metadata
                 chunk_metadata = {
                     **base_metadata,
@@ -238,8 +250,6 @@ class DoclingHybridChunker:
                 end = chunk_end
 
             if chunk_text.strip():
-                token_count = len(self.tokenizer.encode(chunk_text))
-
                 chunks.append(DocumentChunk(
                     content=chunk_text.strip(),
                     index=chunk_index,
@@ -250,7 +260,7 @@ class DoclingHybridChunker:
                         "chunk_method": "simple_fallback",
                         "total_chunks": -1  # Will update after
                     },
-                    token_count=token_count
+                    token_count=0  # Counted below in one batch
                 ))
 
                 chunk_index += 1
@@ -258,9 +268,10 @@ class DoclingHybridChunker:
             # Move forward with overlap
             start = end - overlap
 
-        # Update total chunks
-        for chunk in chunks:
+        # Update total chunks and token counts
+        for chunk, token_count in zip(chunks, self._count_tokens([chunk.content for chunk in chunks])):
             chunk.metadata["total_chunks"] = len(chunks)
+            chunk.token_count = token_count
 
         logger.info(f"Created {len(chunks)} chunks using simple fallback")
         return chunks
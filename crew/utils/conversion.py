@@ -0,0 +1,140 @@
+"""
+Parallel Docling conversion stage for the knowledge import.
+
+Docling's layout and table models make PDF conversion the slowest part of
+the import, and `DocumentConverter.convert_all` handles one file after
+another on a single core. This module spreads the files over a pool of
+worker processes, each with its own long-lived `DocumentConverter`, and
+yields every document as soon as it is finished. The number of documents
+in flight is bounded, so the consumer can chunk and embed each one while
+the others are still being converted, without holding the whole corpus
+in memory.
+
+With a `DocumentCache`, documents converted before are loaded from the
+cache while the pool converts the others, and every new conversion is
+stored in it (see `crew.utils.document_cache`).
+"""
+
+import os
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from docling.document_converter import DocumentConverter
+from docling_core.types.doc import DoclingDocument
+
+from crew.utils.document_cache import DocumentCache
+
+logger = logging.getLogger(__name__)
+
+# Converter of the current worker process, created once by the pool initializer
+_WORKER_CONVERTER: Optional[DocumentConverter] = None
+
+
+def default_workers() -> int:
+    """Default pool size: all cores but one, at least one."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _init_worker():
+    global _WORKER_CONVERTER
+    _WORKER_CONVERTER = DocumentConverter()
+
+
+def _convert_in_worker(path: str) -> Dict[str, Any]:
+    """Convert a file in a worker process and return the document as plain data."""
+    assert _WORKER_CONVERTER is not None, "Worker was not initialized"
+    return _WORKER_CONVERTER.convert(path).document.export_to_dict()
+
+
+def convert_documents(
+    paths: List[str],
+    workers: int = 1,
+    converter: Optional[DocumentConverter] = None,
+    cache: Optional[DocumentCache] = None,
+    hashes: Optional[Dict[str, str]] = None,
+) -> Iterator[Tuple[str, DoclingDocument]]:
+    """
+    Convert files with Docling and yield them in order of completion.
+
+    Files that fail to convert are logged and skipped, so a single broken
+    file does not abort the import.
+
+    Args:
+        paths: Files to convert
+        workers: Number of worker processes, 1 converts in this process
+        converter: Converter to use when converting in this process
+        cache: Cache of converted documents, used for the files in `hashes`
+        hashes: Content hash by path, the cache key of each file
+
+    Yields:
+        Tuples of (path, converted document)
+    """
+    hashes = hashes if cache is not None and hashes else {}
+    cached = [path for path in paths if path in hashes and cache.contains(hashes[path])]  # type: ignore[union-attr]
+    paths = [path for path in paths if path not in cached]
+
+    def store(path: str, document: Any):
+        if path in hashes:
+            try:
+                cache.store(hashes[path], document)  # type: ignore[union-attr]
+            except Exception as e:
+                logger.warning(f"Caching the conversion of {path} failed: {e}")
+
+    def load_cached() -> Iterator[Tuple[str, DoclingDocument]]:
+        for path in cached:
+            document = cache.load(hashes[path])  # type: ignore[union-attr]
+            if document is None:
+                # Unreadable after all, convert it in this process
+                yield from convert_documents([path], 1, converter, cache, hashes)
+                continue
+            yield path, document
+
+    if workers <= 1 or len(paths) <= 1:
+        yield from load_cached()
+
+        if not paths:
+            return
+
+        converter = converter or DocumentConverter()
+        for path in paths:
+            try:
+                document = converter.convert(path).document
+            except Exception as e:
+                logger.error(f"Conversion failed for {path}: {e}")
+                continue
+            store(path, document)
+            yield path, document
+        return
+
+    workers = min(workers, len(paths))
+    # Keep the pool busy but don't let finished documents pile up
+    max_pending = workers * 2
+    queue = list(reversed(paths))
+    pending: Dict[Future, str] = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        while queue and len(pending) < max_pending:
+            path = queue.pop()
+            pending[pool.submit(_convert_in_worker, path)] = path
+
+        # Cached documents are consumed while the pool converts the first files
+        yield from load_cached()
+
+        while queue or pending:
+            while queue and len(pending) < max_pending:
+                path = queue.pop()
+                pending[pool.submit(_convert_in_worker, path)] = path
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    data = future.result()
+                    document = DoclingDocument.model_validate(data)
+                except Exception as e:
+                    logger.error(f"Conversion failed for {path}: {e}")
+                    continue
+                store(path, data)
+                yield path, document
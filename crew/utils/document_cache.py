@@ -0,0 +1,112 @@
+"""
+On-disk cache of converted Docling documents.
+
+PDF conversion with Docling's layout and table models is by far the most
+expensive stage of the import, but its result only depends on the source
+file and the converter. Tuning the chunking used to mean converting the
+whole corpus again. Every converted `DoclingDocument` is therefore stored
+in `knowledge/.document_cache/`, keyed by the SHA-256 of the source file
+and a hash of the installed Docling package versions, so chunking,
+summaries and embedding can start from the cache.
+
+Documents are stored as gzip-compressed JSON, several times smaller than
+the plain export, and are loaded lazily: one at a time, when the import
+gets to them. Entries of other converter versions or of files that are no
+longer in the knowledge directory are removed by `prune`.
+"""
+
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from docling_core.types.doc import DoclingDocument
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_CACHE_DIRNAME = ".document_cache"
+DOCUMENT_CACHE_VERSION = 1
+CONVERTER_PACKAGES = ("docling", "docling-core", "docling-ibm-models", "docling-parse")
+SUFFIX = ".json.gz"
+
+
+@lru_cache(maxsize=1)
+def converter_version() -> str:
+    """Short hash of the cache format and the installed Docling package versions."""
+    versions = [f"cache={DOCUMENT_CACHE_VERSION}"]
+
+    for package in CONVERTER_PACKAGES:
+        try:
+            versions.append(f"{package}={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            continue
+
+    return hashlib.sha256(";".join(versions).encode("utf-8")).hexdigest()[:12]
+
+
+class DocumentCache:
+    """
+    Converted documents by source file hash, for the current converter version.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, file_hash: str) -> Path:
+        return self.directory / f"{file_hash}.{converter_version()}{SUFFIX}"
+
+    def contains(self, file_hash: str) -> bool:
+        return self.path(file_hash).exists()
+
+    def load(self, file_hash: str) -> Optional[DoclingDocument]:
+        """The cached document, None if there is none or it is unreadable."""
+        path = self.path(file_hash)
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                document = DoclingDocument.model_validate(json.load(file))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached document {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return document
+
+    def store(self, file_hash: str, document: Union[DoclingDocument, Dict[str, Any]]):
+        """Store a document, given as model or as its `export_to_dict()`."""
+        data = document.export_to_dict() if isinstance(document, DoclingDocument) else document
+        path = self.path(file_hash)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.", suffix=".tmp")
+
+        try:
+            with open(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as file:
+                file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def prune(self, file_hashes: Iterable[str]) -> int:
+        """Remove all entries except those of `file_hashes` for the current converter version."""
+        keep = {self.path(file_hash).name for file_hash in file_hashes}
+        removed = 0
+
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+                removed += 1
+
+        return removed
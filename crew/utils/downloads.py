@@ -0,0 +1,249 @@
+"""
+Incremental download of the knowledge files.
+
+The source documents rarely change, but every refresh used to download all
+of them one after another into memory and recompress each with Ghostscript.
+`download_files` instead
+
+- downloads concurrently over one pooled session and streams to disk,
+- sends the ETag and Last-Modified validators of the previous download
+  (If-None-Match / If-Modified-Since), so unchanged files cost a 304,
+- keeps the validators and content hashes in `knowledge/.downloads.json`,
+  so files whose content did not change are not replaced even if the server
+  ignores conditional requests,
+- recompresses only new or changed PDFs, in a pool of worker processes,
+  while the remaining downloads continue.
+
+A file that was modified or deleted locally is downloaded again.
+"""
+
+import json
+import shutil
+import hashlib
+import logging
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crew.utils.manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_MANIFEST_FILENAME = ".downloads.json"
+DOWNLOAD_MANIFEST_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class DownloadEntry:
+    """Validators and hashes of a downloaded file."""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    source_hash: str = ""  # Content as downloaded
+    file_hash: str = ""  # Content as stored, after recompression
+
+
+def load_download_manifest(directory: Path) -> Dict[str, DownloadEntry]:
+    """Entries of the previous downloads by filename, empty if there were none."""
+    try:
+        data = json.loads((directory / DOWNLOAD_MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable download manifest: {e}")
+        return {}
+
+    if data.get("version") != DOWNLOAD_MANIFEST_VERSION:
+        return {}
+
+    return {filename: DownloadEntry(**entry) for filename, entry in data.get("files", {}).items()}
+
+
+def save_download_manifest(directory: Path, entries: Dict[str, DownloadEntry]):
+    path = directory / DOWNLOAD_MANIFEST_FILENAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({
+        "version": DOWNLOAD_MANIFEST_VERSION,
+        "files": {filename: asdict(entry) for filename, entry in sorted(entries.items())},
+    }, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Session with a connection pool large enough for all concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _is_unchanged_on_disk(path: Path, entry: Optional[DownloadEntry]) -> bool:
+    return entry is not None and path.exists() and hash_file(path) == entry.file_hash
+
+
+def fetch_file(
+    session: requests.Session,
+    url: str,
+    target: Path,
+    previous: Optional[DownloadEntry],
+    timeout: float = 30.0,
+) -> Tuple[Optional[Path], DownloadEntry]:
+    """
+    Download `url` to a temporary file next to `target`, unless it did not change.
+
+    Returns:
+        The temporary file, None if the file is unchanged, and the new manifest entry
+    """
+    valid = previous is not None and previous.url == url and _is_unchanged_on_disk(target, previous)
+    headers = {}
+
+    if valid:
+        if previous.etag:  # type: ignore[union-attr]
+            headers["If-None-Match"] = previous.etag  # type: ignore[union-attr]
+        if previous.last_modified:  # type: ignore[union-attr]
+            headers["If-Modified-Since"] = previous.last_modified  # type: ignore[union-attr]
+
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 and valid:
+            return None, previous  # type: ignore[return-value]
+
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        part_path = target.with_name(f".{target.name}.part")
+        try:
+            with open(part_path, "wb") as f:
+                for block in response.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(block)
+                    f.write(block)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        entry = DownloadEntry(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            source_hash=digest.hexdigest(),
+        )
+
+    # The server ignored the validators, but the content is the same
+    if valid and entry.source_hash == previous.source_hash:  # type: ignore[union-attr]
+        part_path.unlink()
+        entry.file_hash = previous.file_hash  # type: ignore[union-attr]
+        return None, entry
+
+    return part_path, entry
+
+
+def compress_pdf(source: str, target: str) -> str:
+    """Recompress a PDF with Ghostscript, runs in a worker process."""
+    subprocess.run([
+        "gs",
+        "-q",
+        "-o", target,
+        "-sDEVICE=pdfwrite",
+        "-dPDFSETTINGS=/prepress",
+        source,
+    ], check=True)
+    return target
+
+
+def download_files(
+    urls: Dict[str, str],
+    directory: Path,
+    workers: int = 4,
+    compress_workers: int = 1,
+    force: bool = False,
+    timeout: float = 30.0,
+) -> Dict[str, int]:
+    """
+    Download the files that are new or changed and recompress the PDFs among them.
+
+    Failed downloads are logged and keep the previous file. If the
+    recompression of a new download fails, it is logged and the download is
+    stored uncompressed.
+
+    Args:
+        urls: URL by target filename
+        directory: Knowledge directory
+        workers: Number of concurrent downloads
+        compress_workers: Number of Ghostscript processes
+        force: Ignore the manifest and download everything
+
+    Returns:
+        Number of downloaded, unchanged and failed files
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else load_download_manifest(directory)
+    compress = shutil.which("gs") is not None
+    stats = {"downloaded": 0, "unchanged": 0, "failed": 0}
+
+    if not compress:
+        logger.warning("Ghostscript (gs) not found, PDFs are stored without recompression")
+
+    def store(filename: str, source: Path, entry: DownloadEntry):
+        target = directory / filename
+        source.replace(target)
+        entry.file_hash = hash_file(target)
+        manifest[filename] = entry
+        save_download_manifest(directory, manifest)
+        stats["downloaded"] += 1
+        logger.info(f"Downloaded {filename}")
+
+    session = create_session(workers)
+    pending: Dict[Future, Tuple[str, str, Path, DownloadEntry]] = {}
+
+    with session, ThreadPoolExecutor(max_workers=workers) as downloader, ProcessPoolExecutor(max_workers=compress_workers) as compressor:
+        for filename, url in urls.items():
+            future = downloader.submit(fetch_file, session, url, directory / filename, manifest.get(filename), timeout)
+            pending[future] = ("download", filename, directory / filename, DownloadEntry(url=url))
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, filename, path, entry = pending.pop(future)
+
+                if stage == "download":
+                    try:
+                        part_path, entry = future.result()
+                    except Exception as e:
+                        logger.error(f"Download of {filename} failed: {e}")
+                        stats["failed"] += 1
+                        continue
+
+                    if part_path is None:
+                        manifest[filename] = entry
+                        stats["unchanged"] += 1
+                        continue
+
+                    if compress and filename.lower().endswith(".pdf"):
+                        compressed_path = part_path.with_name(f".{filename}.gs")
+                        pending[compressor.submit(compress_pdf, str(part_path), str(compressed_path))] = (
+                            "compress", filename, part_path, entry)
+                    else:
+                        store(filename, part_path, entry)
+
+                else:
+                    try:
+                        compressed_path = Path(future.result())
+                    except Exception as e:
+                        logger.error(f"Recompression of {filename} failed, storing it as downloaded: {e}")
+                        # Ghostscript may have written part of its output
+                        path.with_name(f".{filename}.gs").unlink(missing_ok=True)
+                        store(filename, path, entry)
+                        continue
+
+                    path.unlink()
+                    store(filename, compressed_path, entry)
+
+    save_download_manifest(directory, manifest)
+    return stats
@@ -0,0 +1,264 @@
+"""
+Persistent cache of embeddings and cross-encoder scores.
+
+Most model inference repeats work that was done before: a re-import after a
+chunking tweak embeds chunks that are byte-identical to those of the last
+import, and agents search for the same things run after run, so the
+cross-encoder scores the same (query, chunk) pairs again. This cache keeps
+
+- embeddings by model and chunk content hash, consulted by the import,
+- cross-encoder scores by model, query hash and chunk hash, consulted by
+  the reranker,
+
+in one SQLite file. When the file grows beyond its size limit, the least
+recently used entries are evicted. Embeddings are stored as float32.
+
+Configuration via environment variables:
+
+- INFERENCE_CACHE_PATH: SQLite file (default: .cache/inference.sqlite)
+- INFERENCE_CACHE_MAX_MB: size limit in MiB, 0 disables the cache (default: 512)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING = "embedding"
+SCORE = "score"
+ROW_OVERHEAD = 100  # Approximate bytes per row besides the value, for the size limit
+EVICT_TO = 0.9  # Fraction of the size limit left after an eviction
+
+
+@dataclass
+class InferenceCacheConfig:
+    """Configuration for the inference cache."""
+    path: Path = Path(".cache/inference.sqlite")
+    max_bytes: int = 512 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "InferenceCacheConfig":
+        """Create a configuration from INFERENCE_CACHE_* environment variables."""
+        return cls(
+            path=Path(os.getenv("INFERENCE_CACHE_PATH", str(cls.path))),
+            max_bytes=int(float(os.getenv("INFERENCE_CACHE_MAX_MB", cls.max_bytes / 1024 / 1024)) * 1024 * 1024),
+        )
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedder_id(embedding_function: Any) -> str:
+    """Identity of an embedding function: its name and configuration, e.g. the model."""
+    try:
+        return f"{embedding_function.name()}:{json.dumps(embedding_function.get_config(), sort_keys=True, default=str)}"
+    except Exception:
+        return f"{type(embedding_function).__module__}.{type(embedding_function).__qualname__}"
+
+
+class InferenceCache:
+    """
+    Thread-safe, size-bounded SQLite cache of embeddings and scores.
+    """
+
+    def __init__(self, config: InferenceCacheConfig):
+        self.config = config
+        self.hits = {EMBEDDING: 0, SCORE: 0}
+        self.misses = {EMBEDDING: 0, SCORE: 0}
+        self._lock = threading.Lock()
+        self._bypassed = False
+        self._db: Optional[sqlite3.Connection] = None
+        self._size = 0
+
+        if config.max_bytes > 0:
+            config.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(config.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(kind TEXT, key TEXT, value BLOB, size INTEGER, used REAL, PRIMARY KEY (kind, key))")
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            self._db.commit()
+            self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None and not self._bypassed
+
+    @contextmanager
+    def bypass(self) -> Iterator[None]:
+        """Neither read nor write the cache within the block, e.g. to time the models."""
+        bypassed, self._bypassed = self._bypassed, True
+        try:
+            yield
+        finally:
+            self._bypassed = bypassed
+
+    def embed(self, texts: Sequence[str], embedding_function: Callable[[List[str]], Any]) -> List[List[float]]:
+        """
+        Embeddings of `texts`, computing only the ones not in the cache in one call.
+
+        Args:
+            texts: Texts to embed
+            embedding_function: Embedding function of the vector store
+
+        Returns:
+            One embedding per text, in input order
+        """
+        if not self.enabled:
+            return [list(vector) for vector in embedding_function(list(texts))]
+
+        model = embedder_id(embedding_function)
+        keys = [self._key(model, text_hash(text)) for text in texts]
+        values = self._get(EMBEDDING, keys)
+        embeddings: List[Optional[List[float]]] = [_unpack(value) if value is not None else None for value in values]
+        missing = [number for number, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            computed = embedding_function([texts[number] for number in missing])
+            for number, vector in zip(missing, computed):
+                embeddings[number] = [float(x) for x in vector]
+            self._put(EMBEDDING, [(keys[number], _pack(embeddings[number])) for number in missing])  # type: ignore[arg-type]
+
+        return embeddings  # type: ignore[return-value]
+
+    def get_scores(self, model: str, pairs: Sequence[Tuple[str, str]]) -> List[Optional[float]]:
+        """Cached scores of (query, content) pairs, None where a pair was not scored before."""
+        if not self.enabled:
+            return [None] * len(pairs)
+
+        return self._get(SCORE, [self._pair_key(model, pair) for pair in pairs])
+
+    def put_scores(self, model: str, pairs: Sequence[Tuple[str, str]], scores: Sequence[float]):
+        """Store the scores of (query, content) pairs."""
+        if not self.enabled:
+            return
+
+        self._put(SCORE, [(self._pair_key(model, pair), float(score)) for pair, score in zip(pairs, scores)])
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits and misses per kind and the approximate size in bytes."""
+        return {"hits": dict(self.hits), "misses": dict(self.misses), "bytes": self._size}
+
+    @staticmethod
+    def _key(model: str, content_hash: str) -> str:
+        return hashlib.sha256(f"{model}\0{content_hash}".encode("utf-8")).hexdigest()
+
+    def _pair_key(self, model: str, pair: Tuple[str, str]) -> str:
+        return self._key(model, f"{text_hash(pair[0])}:{text_hash(pair[1])}")
+
+    def _get(self, kind: str, keys: List[str]) -> List[Any]:
+        if not keys:
+            return []
+
+        found: Dict[str, Any] = {}
+        with self._lock:
+            assert self._db is not None
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value FROM entries WHERE kind = ? AND key IN ({','.join('?' * len(batch))})",
+                    (kind, *batch)).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE entries SET used = ? WHERE kind = ? AND key = ?",
+                    [(now, kind, key) for key in found])
+                self._db.commit()
+
+            self.hits[kind] += sum(key in found for key in keys)
+            self.misses[kind] += sum(key not in found for key in keys)
+
+        return [found.get(key) for key in keys]
+
+    def _put(self, kind: str, items: List[Tuple[str, Any]]):
+        """Store embeddings (bytes) or scores (float)."""
+        if not items:
+            return
+
+        now = time.time()
+        rows = [(kind, key, value, (len(value) if isinstance(value, bytes) else 8) + ROW_OVERHEAD, now) for key, value in items]
+
+        with self._lock:
+            assert self._db is not None
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, used) VALUES (?, ?, ?, ?, ?)", rows)
+            self._size += sum(row[3] for row in rows)
+
+            if self._size > self.config.max_bytes:
+                self._evict()
+
+            self._db.commit()
+
+    def _evict(self):
+        """Delete the least recently used entries until the cache is below EVICT_TO of its limit."""
+        assert self._db is not None
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        excess = self._size - int(self.config.max_bytes * EVICT_TO)
+
+        if excess <= 0:
+            return
+
+        evicted = 0
+        freed = 0
+        while freed < excess:
+            rows = self._db.execute("SELECT rowid, size FROM entries ORDER BY used LIMIT 1000").fetchall()
+            if not rows:
+                break
+
+            doomed = []
+            for rowid, size in rows:
+                if freed >= excess:
+                    break
+                doomed.append((rowid,))
+                freed += size
+
+            self._db.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+            evicted += len(doomed)
+
+        self._size -= freed
+        logger.info(f"Evicted {evicted} inference cache entries ({freed / 1024 / 1024:.1f} MiB)")
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(value: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(value)
+    return vector.tolist()
+
+
+_INFERENCE_CACHE: Optional[InferenceCache] = None
+_INFERENCE_CACHE_LOCK = threading.Lock()
+
+
+def get_inference_cache() -> InferenceCache:
+    """Return the process-wide inference cache, configured from the environment."""
+    global _INFERENCE_CACHE
+
+    if _INFERENCE_CACHE is None:
+        with _INFERENCE_CACHE_LOCK:
+            if _INFERENCE_CACHE is None:
+                _INFERENCE_CACHE = InferenceCache(InferenceCacheConfig.from_env())
+
+    return _INFERENCE_CACHE
@@ -0,0 +1,227 @@
+"""
+Persistent BM25 index over the chunks of the "knowledge" collection.
+
+Dense retrieval with an English MiniLM model regularly misses the exact
+tokens our German legal queries hinge on, like "§ 44 BHO", "Nr. 5.2",
+"ANBest-P-Kosten" or "KMU". A BM25 inverted index matches them literally.
+The document search fuses both candidate lists with reciprocal rank fusion
+before reranking.
+
+The index is rebuilt at the end of `import-knowledge` and stored in
+`knowledge/.lexical_index/` as flat numpy arrays: postings (chunk numbers)
+and term frequencies of all terms back to back, plus a JSON file with the
+vocabulary offsets and chunk ids. The arrays are memory-mapped when loaded,
+so only the postings of the query terms are actually read.
+
+A rebuild writes the new index into a temporary sibling directory and
+swaps it in with renames, so searches that still have the old arrays
+mapped keep reading them unchanged, and an interrupted build leaves the
+previous index in place.
+"""
+
+import os
+import json
+import math
+import re
+import shutil
+import logging
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from crew.utils.manifest import CollectionVersionWatcher
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = Path("knowledge")
+INDEX_DIRNAME = ".lexical_index"
+INDEX_VERSION = 1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Paragraph signs, numbers with dotted parts (5.2, 1.2.3) and words with hyphenated parts
+TOKEN_PATTERN = re.compile(r"§|\d+(?:\.\d+)*|\w+(?:-\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, keeping legal references intact.
+
+    Hyphenated compounds like "ANBest-P-Kosten" are indexed as a whole and
+    as their parts, so both spellings match.
+    """
+    terms = []
+
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        if "-" in token:
+            terms.extend(part for part in token.split("-") if part)
+
+    return terms
+
+
+class LexicalIndex:
+    """
+    Read-only BM25 index backed by memory-mapped arrays.
+    """
+
+    def __init__(
+        self,
+        chunk_ids: List[str],
+        vocabulary: Dict[str, Tuple[int, int]],
+        postings: np.ndarray,
+        frequencies: np.ndarray,
+        lengths: np.ndarray,
+    ):
+        self.chunk_ids = chunk_ids
+        self.vocabulary = vocabulary
+        self.postings = postings
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.average_length = float(lengths.mean()) if len(lengths) else 0.0
+
+    @staticmethod
+    def build(chunks: Iterable[Tuple[str, str]], directory: Path) -> int:
+        """
+        Build the index from (chunk id, content) pairs and write it to `directory`.
+
+        Returns:
+            Number of indexed chunks
+        """
+        chunk_ids: List[str] = []
+        lengths: List[int] = []
+        index: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for number, (chunk_id, content) in enumerate(chunks):
+            terms = tokenize(content or "")
+            chunk_ids.append(chunk_id)
+            lengths.append(len(terms))
+
+            for term, frequency in Counter(terms).items():
+                index[term].append((number, frequency))
+
+        vocabulary: Dict[str, Tuple[int, int]] = {}
+        postings: List[int] = []
+        frequencies: List[int] = []
+
+        for term in sorted(index):
+            vocabulary[term] = (len(postings), len(index[term]))
+            for number, frequency in index[term]:
+                postings.append(number)
+                frequencies.append(frequency)
+
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f"{directory.name}.", suffix=".tmp"))
+
+        try:
+            np.save(tmp_dir / "postings.npy", np.asarray(postings, dtype=np.int32))
+            np.save(tmp_dir / "frequencies.npy", np.asarray(frequencies, dtype=np.uint16))
+            np.save(tmp_dir / "lengths.npy", np.asarray(lengths, dtype=np.int32))
+            (tmp_dir / "index.json").write_text(json.dumps({
+                "version": INDEX_VERSION,
+                "chunk_ids": chunk_ids,
+                "vocabulary": vocabulary,
+            }, ensure_ascii=False), encoding="utf-8")
+            _swap_directory(tmp_dir, directory)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Lexical index built: {len(chunk_ids)} chunks, {len(vocabulary)} terms")
+        return len(chunk_ids)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["LexicalIndex"]:
+        """Load the index with memory-mapped arrays, None if there is no usable index."""
+        try:
+            meta = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+            if meta.get("version") != INDEX_VERSION:
+                logger.warning(f"Lexical index has an outdated format, re-run import-knowledge: {directory}")
+                return None
+
+            return cls(
+                chunk_ids=meta["chunk_ids"],
+                vocabulary={term: tuple(entry) for term, entry in meta["vocabulary"].items()},
+                postings=np.load(directory / "postings.npy", mmap_mode="r"),
+                frequencies=np.load(directory / "frequencies.npy", mmap_mode="r"),
+                lengths=np.load(directory / "lengths.npy", mmap_mode="r"),
+            )
+        except FileNotFoundError:
+            logger.info(f"No lexical index found in {directory}, using vector search only")
+            return None
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Ignoring unreadable lexical index, re-run import-knowledge: {e}")
+            return None
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        """
+        BM25 search.
+
+        Returns:
+            Up to `limit` (chunk id, score) pairs, best first
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        total = len(self.chunk_ids)
+
+        for term in set(tokenize(query)):
+            entry = self.vocabulary.get(term)
+            if entry is None:
+                continue
+
+            start, count = entry
+            numbers = self.postings[start:start + count]
+            frequencies = self.frequencies[start:start + count].astype(np.float32)
+            lengths = self.lengths[numbers]
+
+            idf = math.log(1 + (total - count + 0.5) / (count + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (self.average_length or 1.0))
+            term_scores = idf * frequencies * (BM25_K1 + 1) / (frequencies + norm)
+
+            for number, score in zip(numbers.tolist(), term_scores.tolist()):
+                scores[number] += score
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self.chunk_ids[number], score) for number, score in best]
+
+
+def _swap_directory(source: Path, target: Path):
+    """
+    Replace `target` with `source`.
+
+    Files of the old directory that are still memory-mapped stay readable
+    after it is removed, the mapping keeps them alive.
+    """
+    if not target.exists():
+        os.replace(source, target)
+        return
+
+    old_dir = Path(tempfile.mkdtemp(dir=target.parent, prefix=f"{target.name}.", suffix=".old"))
+    os.replace(target, old_dir / target.name)
+    os.replace(source, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+_INDEX: Optional[LexicalIndex] = None
+_INDEX_VERSION: Optional[str] = None
+_INDEX_WATCHER = CollectionVersionWatcher(KNOWLEDGE_DIR)
+_INDEX_LOCK = threading.Lock()
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Return the process-wide lexical index, reloaded when the collection changed."""
+    global _INDEX, _INDEX_VERSION
+
+    version = _INDEX_WATCHER.current()
+
+    if version != _INDEX_VERSION:
+        with _INDEX_LOCK:
+            if version != _INDEX_VERSION:
+                _INDEX = LexicalIndex.load(KNOWLEDGE_DIR / INDEX_DIRNAME)
+                _INDEX_VERSION = version
+
+    return _INDEX
@@ -0,0 +1,199 @@
+"""
+Persistent LLM response cache with record and replay modes.
+
+Crew runs and the summaries of `import-knowledge` send byte-identical
+prompts again and again while iterating on later tasks or on tool code.
+`cached_llm` wraps an LLM so that responses are stored in a local file
+store, keyed by model, messages and tool schema.
+
+Modes:
+
+- off: no caching, the LLM is used as is
+- cache: serve stored responses, call the LLM and store the response on a miss
+- record: always call the LLM and store (overwrite) the response
+- replay: only serve stored responses, fail on a miss
+- offline: serve stored responses, answer misses with `StandInLLM`
+
+`StandInLLM` is a local stand-in that never leaves the machine. It lets the
+crew run end to end without an API key, e.g. to benchmark the non-LLM hot
+paths deterministically.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.llms.base_llm import BaseLLM
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "cache", "record", "replay", "offline")
+DEFAULT_CACHE_DIR = Path(".cache/llm")
+
+_mode = os.getenv("LLM_CACHE_MODE", "off")
+_cache_dir = Path(os.getenv("LLM_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when no response was recorded for a call."""
+
+
+def configure_llm_cache(mode: str, cache_dir: Optional[Path] = None):
+    """Set the process-wide cache mode used by `cached_llm`."""
+    global _mode, _cache_dir
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM cache mode '{mode}', expected one of {', '.join(MODES)}")
+
+    _mode = mode
+    if cache_dir is not None:
+        _cache_dir = cache_dir
+
+
+def cache_key(model: str, messages: Union[str, List[Dict[str, Any]]], tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Hash of everything that determines an LLM response."""
+    payload = json.dumps([model, messages, tools or []], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """One JSON file per cached response, sharded by key prefix."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))["response"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, model: str, response: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({
+            "model": model,
+            "created": time.time(),
+            "response": response,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+class StandInLLM(BaseLLM):
+    """
+    Local stand-in for a real LLM.
+
+    Answers with the given responses in turn, or with a fixed final answer
+    that satisfies CrewAI's ReAct format.
+    """
+
+    def __init__(self, model: str = "stand-in", responses: Optional[List[str]] = None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.responses = list(responses or [])
+        self.calls: List[Any] = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, **kwargs) -> str:
+        self.calls.append(messages)
+
+        if self.responses:
+            return self.responses.pop(0)
+
+        return "Thought: I now know the final answer\nFinal Answer: Stand-in response, no LLM was called."
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+
+class CachingLLM(BaseLLM):
+    """
+    Wraps an LLM and serves or records its responses according to the mode.
+    """
+
+    def __init__(self, llm: BaseLLM, store: ResponseStore, mode: str):
+        # Set first, `stop` is forwarded to it during initialization
+        self.llm = llm
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None), stop=getattr(llm, "stop", None))
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._stand_in: Optional[StandInLLM] = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything but `call` behaves like the wrapped LLM
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    @property
+    def stop(self) -> Any:
+        return self.llm.stop
+
+    @stop.setter
+    def stop(self, value: Any):
+        # Agents add their stop words to the LLM, they have to reach the wrapped one
+        self.llm.stop = value
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, **kwargs):
+        key = cache_key(self.model, messages, tools)
+
+        if self.mode != "record":
+            response = self.store.get(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+        self.misses += 1
+
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"No recorded response for {self.model} (key {key[:12]})")
+        if self.mode == "offline":
+            self._stand_in = self._stand_in or StandInLLM(model=self.model)
+            return self._stand_in.call(messages, tools=tools)
+
+        response = self.llm.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+            **kwargs,
+        )
+
+        # Only plain text responses can be replayed, tool call results are not stored
+        if isinstance(response, str):
+            self.store.put(key, self.model, response)
+
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def get_token_usage_summary(self) -> Any:
+        return self.llm.get_token_usage_summary()
+
+
+def cached_llm(llm: Any) -> Any:
+    """Wrap `llm` according to the configured mode, unchanged if caching is off."""
+    if _mode == "off" or not isinstance(llm, BaseLLM) or isinstance(llm, CachingLLM):
+        return llm
+
+    return CachingLLM(llm, ResponseStore(_cache_dir), _mode)
@@ -0,0 +1,185 @@
+"""
+Content-addressed manifest for incremental knowledge imports.
+
+The manifest records, per source file in the knowledge directory, the
+SHA-256 of its bytes together with the hash list and the deterministic ids
+of the chunks that were stored for it. On the next import only new or
+changed files have to be converted and embedded again, and chunks of
+removed files can be deleted from the vector store by id.
+
+Chunk ids are derived from the source key, the chunk position and the
+chunk content hash, because the position is stored with the chunk for
+neighbour lookups. A chunk keeps its id, and is not stored again, only if
+its content and its position are unchanged: a chunk inserted or removed
+early in a document changes the ids of all later chunks. Their embeddings
+come from the inference cache (see `crew.utils.inference_cache`), which is
+keyed by content alone.
+"""
+
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".manifest.json"
+MANIFEST_VERSION = 1
+COLLECTION_VERSION_FILENAME = ".collection_version"
+
+
+def hash_file(path: Path, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, index: int, chunk_hash: str) -> str:
+    """Deterministic id of a chunk, stable as long as its content and position are."""
+    return hashlib.sha256(f"{source}\0{index}\0{chunk_hash}".encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ManifestEntry:
+    """Import state of a single source file."""
+    content_hash: str
+    title: str
+    chunk_hashes: List[str] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    summary_key: Optional[str] = None  # Summary cache entry, see crew.utils.summaries
+
+
+class KnowledgeManifest:
+    """
+    JSON-backed manifest of imported knowledge files.
+
+    Keys are file paths relative to the knowledge directory, so the manifest
+    stays valid when the repository is checked out somewhere else.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, ManifestEntry]] = None):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "KnowledgeManifest":
+        """Load the manifest, starting empty if it is missing or unreadable."""
+        if not path.exists():
+            return cls(path)
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info(f"Manifest version changed, starting from scratch: {path}")
+            return cls(path)
+
+        return cls(path, {
+            source: ManifestEntry(**entry)
+            for source, entry in data.get("files", {}).items()
+        })
+
+    def save(self):
+        """Write the manifest atomically."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {source: asdict(entry) for source, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def diff(self, hashes: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """
+        Compare the current file hashes against the manifest.
+
+        A file whose summary (`<title>.summary.md`) is missing counts as
+        changed, so it is summarized again.
+
+        Args:
+            hashes: Content hash per source key of all files currently present
+
+        Returns:
+            Tuple of (new or changed sources, removed sources)
+        """
+        changed = [
+            source for source, content_hash in hashes.items()
+            if source not in self.entries
+            or self.entries[source].content_hash != content_hash
+            # The summary failed or the run ended before it was written
+            or not (self.path.parent / f"{self.entries[source].title}.summary.md").exists()
+        ]
+        removed = [source for source in self.entries if source not in hashes]
+        return changed, removed
+
+
+def write_collection_version(knowledge_dir: Path) -> str:
+    """
+    Mark the "knowledge" collection as changed.
+
+    Readers such as the search cache compare this version to detect that
+    their cached results are outdated.
+    """
+    version = uuid4().hex
+    path = knowledge_dir / COLLECTION_VERSION_FILENAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(version, encoding="utf-8")
+    tmp_path.replace(path)
+    return version
+
+
+def read_collection_version(knowledge_dir: Path) -> str:
+    """Current version of the "knowledge" collection, empty if it was never written."""
+    try:
+        return (knowledge_dir / COLLECTION_VERSION_FILENAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return ""
+
+
+class CollectionVersionWatcher:
+    """
+    Cheap check whether the "knowledge" collection changed.
+
+    The version file is stat'ed at most once per `interval` seconds and only
+    read again when its mtime changed, so callers on a hot path can ask on
+    every call.
+    """
+
+    def __init__(self, knowledge_dir: Path, interval: float = 1.0):
+        self.knowledge_dir = knowledge_dir
+        self.interval = interval
+        self._version = ""
+        self._mtime: Optional[float] = None
+        self._checked: Optional[float] = None
+
+    def current(self) -> str:
+        """The current collection version."""
+        now = time.monotonic()
+
+        if self._checked is None or now - self._checked >= self.interval:
+            self._checked = now
+            try:
+                mtime: Optional[float] = (self.knowledge_dir / COLLECTION_VERSION_FILENAME).stat().st_mtime
+            except FileNotFoundError:
+                mtime = None
+
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self._version = read_collection_version(self.knowledge_dir)
+
+        return self._version
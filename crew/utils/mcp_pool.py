@@ -0,0 +1,123 @@
+"""
+Shared, lazily started MCP server connection.
+
+The Atlassian MCP server is spawned through `uvx`, which resolves its
+dependencies on every start and takes seconds before the first tool call.
+`MCPToolPool` starts the server only when a task actually asks for MCP
+tools, keeps the one connection warm for all tasks of the process and
+caches the tool list, so each task only filters it by name.
+
+The pool is closed explicitly at the end of a kickoff and, as a fallback,
+when the process exits.
+
+Any stdio server works, e.g. the stub in `crew.utils.mcp_stub` for offline
+runs: `MCP_SERVER_COMMAND="python -m crew.utils.mcp_stub"`.
+"""
+
+import time
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MCPToolPool:
+    """
+    One MCP server connection whose tools are shared by all tasks.
+    """
+
+    def __init__(self, server_params: Any, connect_timeout: int = 30):
+        self.server_params = server_params
+        self.connect_timeout = connect_timeout
+        self._adapter: Any = None
+        self._tools: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._adapter is not None
+
+    def _start(self):
+        from crewai_tools import MCPServerAdapter
+
+        start = time.perf_counter()
+        adapter = MCPServerAdapter(self.server_params, connect_timeout=self.connect_timeout)
+
+        try:
+            tools = {tool.name: tool for tool in adapter.tools}
+        except BaseException:
+            # Do not leave the server process running without a reference to stop it
+            try:
+                adapter.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping MCP server: {e}")
+            raise
+
+        self._adapter, self._tools = adapter, tools
+        logger.info(f"MCP server started in {time.perf_counter() - start:.1f}s with {len(self._tools)} tools")
+
+    def tools(self, names: Optional[Iterable[str]] = None) -> List[Any]:
+        """
+        Tools of the server, starting it on first use.
+
+        Args:
+            names: Tool names to return, all tools if omitted
+
+        Returns:
+            The matching tools, unknown names are logged and skipped
+        """
+        with self._lock:
+            if self._tools is None:
+                self._start()
+            tools = self._tools or {}
+
+        if names is None:
+            return list(tools.values())
+
+        names = list(names)
+        missing = [name for name in names if name not in tools]
+        if missing:
+            logger.warning(f"MCP server does not provide the tools: {', '.join(missing)}")
+
+        return [tools[name] for name in names if name in tools]
+
+    def close(self):
+        """Stop the server, the next tool request starts it again."""
+        with self._lock:
+            adapter, self._adapter, self._tools = self._adapter, None, None
+
+        if adapter is None:
+            return
+
+        try:
+            adapter.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping MCP server: {e}")
+
+
+_POOLS: Dict[str, MCPToolPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_mcp_pool(server_params: Any, connect_timeout: int = 30) -> MCPToolPool:
+    """Return the process-wide pool for the given server parameters."""
+    key = repr(server_params)
+
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = MCPToolPool(server_params, connect_timeout=connect_timeout)
+        return _POOLS[key]
+
+
+def close_mcp_pools():
+    """Stop all started MCP servers."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_mcp_pools)
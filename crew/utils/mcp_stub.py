@@ -0,0 +1,41 @@
+"""
+Minimal stdio MCP server standing in for mcp-atlassian.
+
+It provides tools with the names of the Atlassian server's search and read
+tools and answers with fixed content, so crews using MCP tools can run
+offline and without starting `uvx`:
+
+    MCP_SERVER_COMMAND="python -m crew.utils.mcp_stub" uv run main.py kickoff
+"""
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("mcp-stub")
+
+
+@server.tool()
+def jira_search(jql: str, limit: int = 10) -> str:
+    """Search Jira issues using JQL."""
+    return f"No issues found for: {jql}"
+
+
+@server.tool()
+def jira_get_issue(issue_key: str) -> str:
+    """Get the details of a Jira issue."""
+    return f"{issue_key}: stub issue without description"
+
+
+@server.tool()
+def confluence_search(query: str, limit: int = 10) -> str:
+    """Search Confluence content."""
+    return f"No pages found for: {query}"
+
+
+@server.tool()
+def confluence_get_page(page_id: str) -> str:
+    """Get the content of a Confluence page."""
+    return f"Page {page_id}: stub page without content"
+
+
+if __name__ == "__main__":
+    server.run()
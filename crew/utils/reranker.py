@@ -0,0 +1,386 @@
+"""
+Lazy, process-wide cross-encoder reranker with request batching.
+
+Loading `sentence_transformers` and the cross-encoder takes seconds, so the
+model is only loaded when the first pairs are scored, not when the tools are
+imported. All callers in a process share one model through `get_reranker()`.
+
+Concurrent agents issue their searches at the same time. Instead of
+competing for the CPU with separate forward passes, their `(query, content)`
+pairs are queued and a single worker thread scores everything that arrives
+within a short window in one `predict` call.
+
+On CPU-only hosts the PyTorch forward pass dominates the search latency, so
+the model can also run on ONNX Runtime, optionally with dynamically int8
+quantized weights. The ONNX model is exported once into the reranker cache
+directory and loaded from there afterwards. Every export is checked against
+the PyTorch model on a few sample pairs, the score drift is logged and
+stored next to the exported model (`parity-<model file>.json`).
+
+Configuration via environment variables:
+
+- RERANKER_MODEL: cross-encoder model name
+- RERANKER_BACKEND: torch (default), onnx or onnx-int8
+- RERANKER_QUANTIZATION: int8 instruction set for onnx-int8: arm64, avx2 (default), avx512 or avx512_vnni
+- RERANKER_CACHE_DIR: directory of the exported ONNX models (default: .cache/reranker)
+- RERANKER_BATCH_SIZE: maximum number of pairs per `predict` call
+- RERANKER_MAX_WAIT_MS: how long to wait for more requests to fill a batch
+- RERANKER_THREADS: number of CPU threads (default: the runtime's choice)
+"""
+
+import os
+import json
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from crew.utils.inference_cache import get_inference_cache
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_CACHE_DIR = ".cache/reranker"
+BACKENDS = ("torch", "onnx", "onnx-int8")
+QUANTIZATIONS = ("arm64", "avx2", "avx512", "avx512_vnni")
+ONNX_FILE_NAME = "model.onnx"
+
+# Pairs scored by PyTorch and the exported model to report the score drift
+PARITY_PAIRS = [
+    ("Welche Kosten sind im ZIM förderfähig?", "Förderfähig sind Personalkosten, Kosten für Aufträge an Dritte und übrige Kosten in Höhe einer Pauschale."),
+    ("Welche Kosten sind im ZIM förderfähig?", "Der Antrag ist vor Beginn des Vorhabens bei dem zuständigen Projektträger einzureichen."),
+    ("Welche Kosten sind im ZIM förderfähig?", "Die Personalkosten werden auf Basis der Jahresbruttolöhne berechnet."),
+    ("Wie hoch ist die Förderquote für kleine Unternehmen?", "Kleine Unternehmen erhalten bei Einzelprojekten eine Förderquote von bis zu 45 Prozent."),
+    ("Wie hoch ist die Förderquote für kleine Unternehmen?", "Kooperationsprojekte bestehen aus mindestens zwei Teilprojekten."),
+    ("Wie hoch ist die Förderquote für kleine Unternehmen?", "Mittlere Unternehmen erhalten eine um zehn Prozentpunkte niedrigere Förderquote."),
+    ("Was regelt § 44 BHO?", "Zuwendungen dürfen nur unter den Voraussetzungen des § 23 BHO gewährt werden."),
+    ("Was regelt § 44 BHO?", "Das Vorhaben muss technologisch anspruchsvoll sein und deutlich über den Stand der Technik hinausgehen."),
+]
+
+
+@dataclass
+class RerankerConfig:
+    """Configuration for the reranker."""
+    model_name: str = DEFAULT_MODEL
+    backend: str = "torch"  # One of BACKENDS
+    quantization: str = "avx2"  # Instruction set of the int8 kernels, for backend onnx-int8
+    cache_dir: str = DEFAULT_CACHE_DIR  # Exported ONNX models
+    batch_size: int = 64  # Maximum pairs per forward pass
+    max_wait_ms: float = 5.0  # Time to collect concurrent requests into a batch
+    num_threads: Optional[int] = None  # CPU threads, None keeps the default
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown reranker backend '{self.backend}', expected one of {', '.join(BACKENDS)}")
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown reranker quantization '{self.quantization}', expected one of {', '.join(QUANTIZATIONS)}")
+
+    @classmethod
+    def from_env(cls) -> "RerankerConfig":
+        """Create a configuration from RERANKER_* environment variables."""
+        threads = os.getenv("RERANKER_THREADS")
+        return cls(
+            model_name=os.getenv("RERANKER_MODEL", DEFAULT_MODEL),
+            backend=os.getenv("RERANKER_BACKEND", cls.backend).lower(),
+            quantization=os.getenv("RERANKER_QUANTIZATION", cls.quantization).lower(),
+            cache_dir=os.getenv("RERANKER_CACHE_DIR", DEFAULT_CACHE_DIR),
+            batch_size=int(os.getenv("RERANKER_BATCH_SIZE", cls.batch_size)),
+            max_wait_ms=float(os.getenv("RERANKER_MAX_WAIT_MS", cls.max_wait_ms)),
+            num_threads=int(threads) if threads else None,
+        )
+
+    @property
+    def export_path(self) -> Path:
+        """Directory of the exported ONNX model."""
+        return Path(self.cache_dir) / self.model_name.replace("/", "--")
+
+    @property
+    def onnx_file_name(self) -> str:
+        """File name of the ONNX model to load, inside `export_path / "onnx"`."""
+        if self.backend == "onnx-int8":
+            return f"model_qint8_{self.quantization}.onnx"
+        return ONNX_FILE_NAME
+
+    @property
+    def model_id(self) -> str:
+        """Model and backend, scores of different backends differ slightly."""
+        if self.backend == "onnx-int8":
+            return f"{self.model_name}:{self.backend}:{self.quantization}"
+        return f"{self.model_name}:{self.backend}"
+
+    @property
+    def parity_path(self) -> Path:
+        """Parity report of the exported model."""
+        return self.export_path / f"parity-{Path(self.onnx_file_name).stem}.json"
+
+
+def score_drift(baseline: Sequence[float], scores: Sequence[float]) -> Dict[str, float]:
+    """Maximum and mean absolute difference between two score lists of the same pairs."""
+    differences = [abs(a - b) for a, b in zip(baseline, scores)]
+    return {
+        "max_abs_drift": max(differences, default=0.0),
+        "mean_abs_drift": sum(differences) / len(differences) if differences else 0.0,
+    }
+
+
+def _export_onnx(config: RerankerConfig) -> Path:
+    """
+    Export the model to ONNX (and quantize it) unless the cache already has it.
+
+    The export is written to a temporary directory that is moved into place,
+    so a concurrent or interrupted export never leaves a partial model behind.
+    """
+    from sentence_transformers import CrossEncoder
+
+    path = config.export_path
+
+    if not (path / "onnx" / ONNX_FILE_NAME).exists():
+        logger.info(f"Exporting cross-encoder {config.model_name} to ONNX in {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        model = CrossEncoder(config.model_name, backend="onnx")
+        tmp_path = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"))
+
+        try:
+            model.save_pretrained(str(tmp_path))
+
+            # Left over by an export from before the move into place was atomic
+            if path.exists() and not (path / "onnx" / ONNX_FILE_NAME).exists():
+                logger.warning(f"Removing incomplete ONNX export {path}")
+                shutil.rmtree(path, ignore_errors=True)
+
+            tmp_path.replace(path)
+        except OSError:
+            # Exported by another process in the meantime
+            if not (path / "onnx" / ONNX_FILE_NAME).exists():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    if not (path / "onnx" / config.onnx_file_name).exists():
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+        logger.info(f"Quantizing cross-encoder {config.model_name} to int8 ({config.quantization})")
+        model = CrossEncoder(str(path), backend="onnx", model_kwargs={"file_name": ONNX_FILE_NAME})
+        export_dynamic_quantized_onnx_model(model, config.quantization, str(path))
+
+    return path
+
+
+def load_cross_encoder(config: RerankerConfig) -> Any:
+    """
+    Load the cross-encoder on the configured backend, exporting it to ONNX first if needed.
+
+    An exported model gets a parity check against PyTorch on its first load.
+    """
+    # Imported here, torch and sentence_transformers are slow to import
+    from sentence_transformers import CrossEncoder
+
+    if config.backend == "torch":
+        if config.num_threads:
+            import torch
+            torch.set_num_threads(config.num_threads)
+
+        logger.info(f"Loading cross-encoder: {config.model_name}")
+        return CrossEncoder(config.model_name)
+
+    path = _export_onnx(config)
+    model_kwargs: Dict[str, Any] = {"file_name": config.onnx_file_name, "provider": "CPUExecutionProvider"}
+
+    if config.num_threads:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = config.num_threads
+        model_kwargs["session_options"] = session_options
+
+    logger.info(f"Loading cross-encoder: {config.model_name} ({config.backend})")
+    model = CrossEncoder(str(path), backend="onnx", model_kwargs=model_kwargs)
+
+    if not config.parity_path.exists():
+        check_parity(config, model)
+
+    return model
+
+
+def check_parity(config: RerankerConfig, model: Any = None, pairs: Sequence[Tuple[str, str]] = PARITY_PAIRS) -> Dict[str, Any]:
+    """
+    Score `pairs` with PyTorch and the configured backend and report the drift.
+
+    The result is logged and, for ONNX backends, stored next to the exported model.
+
+    Args:
+        config: Reranker configuration with the backend to check
+        model: Loaded model of that backend, loaded from `config` if None
+        pairs: (query, content) pairs to score
+
+    Returns:
+        Maximum and mean absolute score drift and whether the ranking per query is the same
+    """
+    baseline_model = load_cross_encoder(RerankerConfig(model_name=config.model_name, num_threads=config.num_threads))
+    model = model or load_cross_encoder(config)
+
+    baseline = [float(s) for s in baseline_model.predict(list(pairs), batch_size=config.batch_size)]
+    scores = [float(s) for s in model.predict(list(pairs), batch_size=config.batch_size)]
+
+    indices_by_query: Dict[str, List[int]] = {}
+    for index, (query, _) in enumerate(pairs):
+        indices_by_query.setdefault(query, []).append(index)
+
+    same_ranking = all(
+        sorted(indices, key=lambda i: -baseline[i]) == sorted(indices, key=lambda i: -scores[i])
+        for indices in indices_by_query.values()
+    )
+
+    result: Dict[str, Any] = {
+        "model": config.model_name,
+        "backend": config.backend,
+        "pairs": len(pairs),
+        **score_drift(baseline, scores),
+        "same_ranking": same_ranking,
+    }
+
+    logger.info(
+        f"Reranker parity {config.backend} vs. torch: max drift {result['max_abs_drift']:.4f}, "
+        f"mean drift {result['mean_abs_drift']:.4f}, {'same' if same_ranking else 'different'} ranking")
+    if not same_ranking:
+        logger.warning(f"Reranker backend {config.backend} ranks the parity pairs differently than torch")
+
+    if config.backend != "torch":
+        config.parity_path.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    return result
+
+
+@dataclass
+class _Request:
+    pairs: List[Tuple[str, str]]
+    future: Future = field(default_factory=Future)
+
+
+class Reranker:
+    """
+    Cross-encoder that loads on first use and batches concurrent requests.
+    """
+
+    def __init__(self, config: RerankerConfig):
+        self.config = config
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def model(self) -> Any:
+        """The cross-encoder, loaded on first access."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    def _load(self) -> Any:
+        return load_cross_encoder(self.config)
+
+    def score(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        """
+        Score (query, content) pairs, sharing the forward pass with concurrent callers.
+
+        Pairs scored before are taken from the inference cache (see
+        `crew.utils.inference_cache`), only the others are queued.
+
+        Args:
+            pairs: Pairs of query and document content
+
+        Returns:
+            One relevance score per pair, in input order
+        """
+        if not pairs:
+            return []
+
+        cache = get_inference_cache()
+        scores = cache.get_scores(self.config.model_id, pairs)
+        missing = [number for number, score in enumerate(scores) if score is None]
+
+        if missing:
+            self._ensure_worker()
+            request = _Request([pairs[number] for number in missing])
+            self._queue.put(request)
+            computed = request.future.result()
+            cache.put_scores(self.config.model_id, request.pairs, computed)
+
+            for number, score in zip(missing, computed):
+                scores[number] = score
+
+        return scores  # type: ignore[return-value]
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="reranker", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_Request]:
+        """Block for the next request and add whatever arrives until the batch is full."""
+        batch = [self._queue.get()]
+        size = len(batch[0].pairs)
+        deadline = time.monotonic() + self.config.max_wait_ms / 1000
+
+        while size < self.config.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.pairs)
+
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            pairs = [pair for request in batch for pair in request.pairs]
+
+            try:
+                scores = self.model.predict(pairs, batch_size=self.config.batch_size)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                request.future.set_result([float(s) for s in scores[offset:offset + len(request.pairs)]])
+                offset += len(request.pairs)
+
+
+_RERANKER: Optional[Reranker] = None
+_RERANKER_LOCK = threading.Lock()
+
+
+def get_reranker() -> Reranker:
+    """Return the process-wide reranker, configured from the environment."""
+    global _RERANKER
+
+    if _RERANKER is None:
+        with _RERANKER_LOCK:
+            if _RERANKER is None:
+                _RERANKER = Reranker(RerankerConfig.from_env())
+
+    return _RERANKER
@@ -0,0 +1,132 @@
+"""
+Dependency-based parallel task scheduling for the crew.
+
+The `context:` lists in `tasks.yaml` already describe which task needs the
+output of which other task. Two tasks additionally have to run one after
+the other when they write the same workspace file (declared as `writes:`),
+when one reads a file the other writes (`reads:`), or when they are
+performed by the same agent, because an agent executes one task at a
+time. Everything else may run concurrently.
+
+CrewAI's sequential process runs tasks marked `async_execution` in the
+background until the next synchronous task, which first waits for all of
+them. The tasks are therefore ordered in topological waves, and each wave
+is split into stages of at most `max_parallel` tasks: all but the last task
+of a stage run asynchronously, the last one runs synchronously and acts as
+the barrier before the next stage. Total latency then follows the critical
+path of the graph instead of the sum of all tasks.
+"""
+
+import logging
+from typing import Any, Dict, List, Mapping, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+
+def task_dependencies(names: Sequence[str], tasks_config: Mapping[str, Mapping[str, Any]]) -> Dict[str, Set[str]]:
+    """
+    Derive the dependencies of each task from its configuration.
+
+    Explicit `context` entries are dependencies. Of two tasks that write the
+    same file, where one reads a file the other writes, or that share an
+    agent, the one declared later depends on the earlier one.
+
+    Args:
+        names: Task names in declaration order
+        tasks_config: Task configuration by name, as loaded from tasks.yaml
+
+    Returns:
+        Set of prerequisite task names per task name
+    """
+    dependencies: Dict[str, Set[str]] = {name: set() for name in names}
+    last_writer: Dict[str, str] = {}
+    readers: Dict[str, Set[str]] = {}
+    last_task_of_agent: Dict[str, str] = {}
+
+    for name in names:
+        config = tasks_config.get(name, {})
+
+        for context in config.get("context") or []:
+            # CrewAI may have resolved the names to Task objects already
+            context_name = getattr(context, "name", context)
+            if context_name in dependencies and context_name != name:
+                dependencies[name].add(context_name)
+
+        for filename in config.get("reads") or []:
+            if filename in last_writer:
+                dependencies[name].add(last_writer[filename])
+            readers.setdefault(filename, set()).add(name)
+
+        for filename in config.get("writes") or []:
+            # A writer waits for the tasks reading the previous content
+            dependencies[name].update(readers.pop(filename, set()) - {name})
+            if filename in last_writer:
+                dependencies[name].add(last_writer[filename])
+            last_writer[filename] = name
+
+        agent = config.get("agent")
+        agent_key = getattr(agent, "role", agent)
+        if agent_key:
+            if agent_key in last_task_of_agent:
+                dependencies[name].add(last_task_of_agent[agent_key])
+            last_task_of_agent[agent_key] = name
+
+    return dependencies
+
+
+def task_waves(names: Sequence[str], dependencies: Mapping[str, Set[str]]) -> List[List[str]]:
+    """
+    Group tasks into waves whose tasks only depend on earlier waves.
+
+    Tasks keep their declaration order within a wave.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    remaining = list(names)
+    done: Set[str] = set()
+    waves: List[List[str]] = []
+
+    while remaining:
+        wave = [name for name in remaining if dependencies.get(name, set()) <= done]
+
+        if not wave:
+            raise ValueError(f"Task dependencies contain a cycle: {', '.join(remaining)}")
+
+        waves.append(wave)
+        done.update(wave)
+        remaining = [name for name in remaining if name not in done]
+
+    return waves
+
+
+def schedule_tasks(tasks: List[Any], tasks_config: Mapping[str, Mapping[str, Any]], max_parallel: int = 3) -> List[Any]:
+    """
+    Order tasks by dependency waves and mark the ones that may run concurrently.
+
+    Args:
+        tasks: CrewAI tasks, named after their configuration key
+        tasks_config: Task configuration by name
+        max_parallel: Maximum number of tasks running at the same time
+
+    Returns:
+        The tasks in execution order, with `async_execution` set
+    """
+    by_name = {task.name: task for task in tasks}
+    names = [task.name for task in tasks]
+    waves = task_waves(names, task_dependencies(names, tasks_config))
+    ordered = []
+
+    for wave in waves:
+        for start in range(0, len(wave), max(1, max_parallel)):
+            stage = wave[start:start + max(1, max_parallel)]
+
+            for position, name in enumerate(stage):
+                # The last task of a stage is the barrier for the next one
+                by_name[name].async_execution = position < len(stage) - 1
+                ordered.append(by_name[name])
+
+    logger.info("Task schedule: " + " | ".join(
+        ", ".join(f"{name}{'*' if by_name[name].async_execution else ''}" for name in wave) for wave in waves
+    ))
+    return ordered
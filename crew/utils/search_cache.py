@@ -0,0 +1,183 @@
+"""
+Result cache for the document search.
+
+The agents of a crew run ask the same or almost the same questions again
+and again. Each search costs a vector query and a cross-encoder pass over
+all candidates, so the formatted result is cached in a bounded LRU with a
+TTL, keyed by the normalized query text and the retrieval parameters.
+Optionally, results are also kept in a SQLite file so they survive
+between runs.
+
+Every entry remembers the collection version it was computed for (see
+`crew.utils.manifest.write_collection_version`). After `import-knowledge`
+changed the collection, all older entries are treated as misses.
+
+Configuration via environment variables:
+
+- SEARCH_CACHE_SIZE: maximum number of entries in memory, 0 disables the cache
+- SEARCH_CACHE_TTL: seconds an entry stays valid
+- SEARCH_CACHE_PATH: SQLite file for a persistent cache (default: memory only)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from crew.utils.manifest import CollectionVersionWatcher
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = Path("knowledge")
+
+
+@dataclass
+class SearchCacheConfig:
+    """Configuration for the search cache."""
+    max_entries: int = 256
+    ttl_seconds: float = 3600.0
+    disk_path: Optional[Path] = None
+
+    @classmethod
+    def from_env(cls) -> "SearchCacheConfig":
+        """Create a configuration from SEARCH_CACHE_* environment variables."""
+        disk_path = os.getenv("SEARCH_CACHE_PATH")
+        return cls(
+            max_entries=int(os.getenv("SEARCH_CACHE_SIZE", cls.max_entries)),
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", cls.ttl_seconds)),
+            disk_path=Path(disk_path) if disk_path else None,
+        )
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", query).split()).lower()
+
+
+class SearchCache:
+    """
+    Thread-safe LRU cache with TTL for search results.
+    """
+
+    def __init__(self, config: SearchCacheConfig, knowledge_dir: Path = KNOWLEDGE_DIR):
+        self.config = config
+        self.knowledge_dir = knowledge_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = ""
+        self._version_watcher = CollectionVersionWatcher(knowledge_dir)
+        self._db: Optional[sqlite3.Connection] = None
+
+        if config.disk_path and config.max_entries > 0:
+            config.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(config.disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache "
+                "(key TEXT PRIMARY KEY, created REAL, version TEXT, value TEXT)")
+            self._db.commit()
+
+    @staticmethod
+    def key(query: str, **params: Any) -> str:
+        """Cache key of a query and the parameters that influence its result."""
+        payload = json.dumps([normalize_query(query), params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def version(self) -> str:
+        """Current collection version, dropping all entries in memory when it changed."""
+        version = self._version_watcher.current()
+
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+
+        return self._version
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None, counting hits and misses."""
+        if self.config.max_entries <= 0:
+            return None
+
+        with self._lock:
+            version = self.version
+            entry = self._entries.get(key)
+
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, version, value FROM search_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1], row[2])
+
+            if entry is not None and entry[1] == version and time.time() - entry[0] < self.config.ttl_seconds:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._evict()
+                self.hits += 1
+                return entry[2]
+
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """Store a value for the current collection version."""
+        if self.config.max_entries <= 0:
+            return
+
+        with self._lock:
+            entry = (time.time(), self.version, value)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, created, version, value) VALUES (?, ?, ?, ?)",
+                    (key, *entry))
+                self._db.execute(
+                    "DELETE FROM search_cache WHERE version != ? OR created < ?",
+                    (entry[1], entry[0] - self.config.ttl_seconds))
+                self._db.execute(
+                    "DELETE FROM search_cache WHERE key NOT IN "
+                    "(SELECT key FROM search_cache ORDER BY created DESC LIMIT ?)",
+                    (self.config.max_entries,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and the number of entries in memory."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _evict(self):
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+
+_SEARCH_CACHE: Optional[SearchCache] = None
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, configured from the environment."""
+    global _SEARCH_CACHE
+
+    if _SEARCH_CACHE is None:
+        with _SEARCH_CACHE_LOCK:
+            if _SEARCH_CACHE is None:
+                _SEARCH_CACHE = SearchCache(SearchCacheConfig.from_env())
+
+    return _SEARCH_CACHE
@@ -0,0 +1,15 @@
+"""
+Small statistics helpers shared by the benchmarks and the run tracing.
+"""
+
+from typing import List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values`, q in [0, 100]."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(1, round(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,160 @@
+"""
+Concurrent, cached document summaries for the knowledge import.
+
+Every imported document gets a short `<name>.summary.md` next to it that
+the document search attaches to its results. The summary is created by an
+LLM from the first characters of the document. `LLM.call` blocks, so the
+calls run in a bounded thread pool while the import continues with
+chunking and embedding.
+
+Responses are cached on disk by a hash of the model, the prompt and the
+snippet. A document whose beginning did not change reuses its summary
+without another LLM round trip. The manifest records the cache key of
+every file once its summary is written, `prune_summary_cache` removes the
+entries no file uses.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from textwrap import dedent
+from typing import Callable, Iterable, List, Optional
+
+from crewai import LLM
+from docling_core.types.doc import DoclingDocument
+
+from crew.utils.llm_cache import cached_llm
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = "gpt-4.1"
+SNIPPET_LENGTH = 1000
+CACHE_DIRNAME = ".summary_cache"
+
+
+def summary_prompt(name: str) -> str:
+    """System prompt for the summary of the document `name`."""
+    return dedent(
+        f"""
+        You are an assistant that analyzes documents. You classify the snippet and create a summary of 3 sentences without giving details about the contents. Always use the document's language. Use the following md-format without fences like "```":
+
+        ```
+        ## {name}
+
+        Type: <type of document, e.g., Contract, Report, Email, Invoice, etc.>
+        Creator: <document creator if available>
+        Audience: <intended audience if available>
+        Summary: <three-sentence summary>
+        ```
+        """)
+
+
+class SummaryGenerator:
+    """
+    Creates document summaries concurrently with a bounded number of LLM calls.
+
+    Use as a context manager; leaving it waits for all pending summaries.
+    """
+
+    def __init__(self, knowledge_dir: Path, concurrency: int = 4, model: str = SUMMARY_MODEL):
+        self.knowledge_dir = knowledge_dir
+        self.cache_dir = knowledge_dir / CACHE_DIRNAME
+        self.model = model
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="summary")
+        self._futures: List[Future] = []
+
+    def __enter__(self) -> "SummaryGenerator":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def cache_key(self, prompt: str, snippet: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{prompt}\0{snippet}".encode("utf-8")).hexdigest()
+
+    def submit(self, doc: DoclingDocument, on_done: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        Schedule the summary of a document.
+
+        The snippet is taken right away, so the document does not have to
+        be kept alive until the summary is done.
+
+        Args:
+            doc: Converted document
+            on_done: Called with the key of the summary's cache entry once
+                the summary is written, not if it fails
+        """
+        snippet = doc.export_to_markdown()[:SNIPPET_LENGTH]
+        key = self.cache_key(summary_prompt(doc.name), snippet)
+        future = self._executor.submit(self._summarize, doc.name, snippet, key, on_done)
+        self._futures.append(future)
+        return future
+
+    def close(self):
+        """Wait for all pending summaries and log the ones that failed."""
+        self._executor.shutdown(wait=True)
+
+        for future in self._futures:
+            if future.exception():
+                logger.error(f"Summary generation failed: {future.exception()}")
+                self.failed += 1
+
+        self._futures.clear()
+
+    def _summarize(self, name: str, snippet: str, key: str, on_done: Optional[Callable[[str], None]] = None) -> str:
+        prompt = summary_prompt(name)
+        cache_path = self.cache_dir / f"{key}.md"
+
+        if cache_path.exists():
+            with self._lock:
+                self.cache_hits += 1
+            summary = cache_path.read_text(encoding="utf-8")
+        else:
+            with self._lock:
+                self.cache_misses += 1
+            summary = cached_llm(LLM(model=self.model)).call(messages=[{
+                "role": "system",
+                "content": prompt
+            }, {
+                "role": "user",
+                "content": snippet
+            }])
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(summary, encoding="utf-8")
+
+        summary_path = self.knowledge_dir / f"{name}.summary.md"
+        summary_path.write_text(summary, encoding="utf-8")
+
+        if on_done:
+            on_done(key)
+
+        return summary
+
+
+def prune_summary_cache(knowledge_dir: Path, keys: Iterable[Optional[str]]) -> int:
+    """
+    Remove the cached summaries except those of `keys`.
+
+    Nothing is removed while a key is unknown (None), e.g. for files
+    imported before the manifest recorded it.
+    """
+    keys = list(keys)
+    if any(key is None for key in keys):
+        return 0
+
+    keep = {f"{key}.md" for key in keys}
+    removed = 0
+
+    for path in (knowledge_dir / CACHE_DIRNAME).glob("*.md"):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+
+    return removed
@@ -0,0 +1,100 @@
+"""
+In-memory index of the document summaries in the knowledge directory.
+
+The document search attaches the `<title>.summary.md` of every document
+that appears in its results. Instead of opening these files on every
+search, they are loaded once into a dict keyed by document title.
+
+The index is refreshed when `import-knowledge` bumps the collection
+version, which is also when summaries are written. A refresh only re-reads
+summaries whose mtime changed and drops the ones that were deleted.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from crew.utils.manifest import CollectionVersionWatcher
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DIR = Path("knowledge")
+SUMMARY_SUFFIX = ".summary.md"
+
+
+class SummaryIndex:
+    """
+    Document summaries by title, kept in sync with the summary files.
+    """
+
+    def __init__(self, knowledge_dir: Path = KNOWLEDGE_DIR):
+        self.knowledge_dir = knowledge_dir
+        self._summaries: Dict[str, Tuple[float, str]] = {}
+        self._version: Optional[str] = None
+        self._version_watcher = CollectionVersionWatcher(knowledge_dir)
+        self._lock = threading.Lock()
+
+    def get(self, title: str) -> Optional[str]:
+        """Summary of the document `title`, None if there is none."""
+        self._refresh_if_changed()
+        entry = self._summaries.get(title)
+        return entry[1] if entry else None
+
+    def get_many(self, titles: List[str]) -> List[str]:
+        """Summaries of all titles that have one, in the given order."""
+        summaries = []
+
+        for title in titles:
+            summary = self.get(title)
+
+            if summary is None:
+                logger.debug(f"No summary for document: {title}")
+                continue
+
+            summaries.append(summary)
+
+        return summaries
+
+    def refresh(self):
+        """Re-read new and modified summary files and forget deleted ones."""
+        with self._lock:
+            summaries: Dict[str, Tuple[float, str]] = {}
+
+            for path in self.knowledge_dir.glob(f"*{SUMMARY_SUFFIX}"):
+                title = path.name[:-len(SUMMARY_SUFFIX)]
+                known = self._summaries.get(title)
+
+                try:
+                    mtime = path.stat().st_mtime
+                    if known and known[0] == mtime:
+                        summaries[title] = known
+                    else:
+                        summaries[title] = (mtime, path.read_text(encoding="utf-8"))
+                except OSError as e:
+                    logger.warning(f"Could not read summary {path}: {e}")
+
+            self._summaries = summaries
+
+    def _refresh_if_changed(self):
+        version = self._version_watcher.current()
+
+        if version != self._version:
+            self.refresh()
+            self._version = version
+
+
+_SUMMARY_INDEX: Optional[SummaryIndex] = None
+_SUMMARY_INDEX_LOCK = threading.Lock()
+
+
+def get_summary_index() -> SummaryIndex:
+    """Return the process-wide summary index."""
+    global _SUMMARY_INDEX
+
+    if _SUMMARY_INDEX is None:
+        with _SUMMARY_INDEX_LOCK:
+            if _SUMMARY_INDEX is None:
+                _SUMMARY_INDEX = SummaryIndex()
+
+    return _SUMMARY_INDEX
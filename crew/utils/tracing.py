@@ -0,0 +1,323 @@
+"""
+Performance spans for crew runs.
+
+A 20-minute kickoff only reports its total token usage. This module
+listens to CrewAI's event bus and records a span for every task, every
+tool invocation (document search, chunk context, workspace I/O, web search
+and scrape, MCP tools) and every LLM call, with the agent and task it
+belongs to. Tasks also carry the token usage of their agent's LLM during
+the task; CrewAI's LLM events report no per-call usage, so LLM spans only
+carry their duration.
+
+After the run the spans are aggregated into a report per kind, name, agent
+and task, and exported as:
+
+- a JSON trace with all spans and the report,
+- optionally a Prometheus textfile (for the node exporter's textfile collector),
+- optionally an OTLP/JSON file that OpenTelemetry tooling can import.
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai.events import (
+    BaseEventListener,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+)
+
+from crew.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+TOKEN_FIELDS = ("total_tokens", "prompt_tokens", "completion_tokens", "successful_requests")
+
+
+@dataclass
+class Span:
+    """A timed operation of a crew run."""
+    kind: str  # "task", "tool" or "llm"
+    name: str
+    start: float
+    end: float
+    agent: Optional[str] = None
+    task: Optional[str] = None
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _timestamp(value: Any, default: Optional[float] = None) -> float:
+    """Epoch seconds of an event timestamp."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return default if default is not None else time.time()
+
+
+def _token_usage(agent: Any) -> Dict[str, int]:
+    """Token counters of an agent's LLM, empty if it does not track them."""
+    try:
+        usage = agent.llm.get_token_usage_summary()
+    except Exception:
+        return {}
+
+    return {name: int(getattr(usage, name, 0) or 0) for name in TOKEN_FIELDS}
+
+
+class PerformanceTracer(BaseEventListener):
+    """
+    Records spans from CrewAI events.
+
+    Instantiating the tracer registers it with the event bus.
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._open_tasks: Dict[Any, Dict[str, Any]] = {}
+        self._open_llm_calls: Dict[Any, List[float]] = {}
+        super().__init__()
+
+    def _add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task = getattr(event, "task", None) or source
+            with self._lock:
+                self._open_tasks[id(task)] = {
+                    "start": _timestamp(getattr(event, "timestamp", None)),
+                    "tokens": _token_usage(getattr(task, "agent", None)),
+                }
+
+        def on_task_finished(source, event, error: Optional[str] = None):
+            task = getattr(event, "task", None) or source
+            with self._lock:
+                opened = self._open_tasks.pop(id(task), None)
+            if opened is None:
+                return
+
+            agent = getattr(task, "agent", None)
+            tokens_after = _token_usage(agent)
+            tokens = {
+                name: tokens_after[name] - opened["tokens"].get(name, 0)
+                for name in tokens_after
+            }
+
+            self._add(Span(
+                kind="task",
+                name=getattr(task, "name", None) or "unknown",
+                start=opened["start"],
+                end=_timestamp(getattr(event, "timestamp", None)),
+                agent=getattr(agent, "role", None),
+                task=getattr(task, "name", None),
+                error=error,
+                attributes={"tokens": tokens},
+            ))
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            on_task_finished(source, event)
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            on_task_finished(source, event, error=str(getattr(event, "error", "failed")))
+
+        def on_tool_finished(event, error: Optional[str] = None):
+            end = _timestamp(getattr(event, "finished_at", None) or getattr(event, "timestamp", None))
+            start = _timestamp(getattr(event, "started_at", None), default=end)
+
+            self._add(Span(
+                kind="tool",
+                name=getattr(event, "tool_name", None) or "unknown",
+                start=start,
+                end=end,
+                agent=getattr(event, "agent_role", None),
+                task=getattr(event, "task_name", None),
+                error=error,
+                attributes={"from_cache": bool(getattr(event, "from_cache", False))},
+            ))
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_usage_finished(source, event):
+            on_tool_finished(event)
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_usage_error(source, event):
+            on_tool_finished(event, error=str(getattr(event, "error", "failed")))
+
+        def llm_call_key(event) -> Any:
+            # LLM events carry no call id, calls of one agent in one task are paired in order
+            return getattr(event, "agent_id", None), getattr(event, "task_id", None)
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_call_started(source, event):
+            with self._lock:
+                self._open_llm_calls.setdefault(llm_call_key(event), []).append(
+                    _timestamp(getattr(event, "timestamp", None)))
+
+        def on_llm_call_finished(event, error: Optional[str] = None):
+            with self._lock:
+                starts = self._open_llm_calls.get(llm_call_key(event))
+                start = starts.pop(0) if starts else None
+            end = _timestamp(getattr(event, "timestamp", None))
+
+            self._add(Span(
+                kind="llm",
+                name=str(getattr(event, "model", None) or "llm"),
+                start=start if start is not None else end,
+                end=end,
+                agent=getattr(event, "agent_role", None),
+                task=getattr(event, "task_name", None),
+                error=error,
+            ))
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_call_completed(source, event):
+            on_llm_call_finished(event)
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_call_failed(source, event):
+            on_llm_call_finished(event, error=str(getattr(event, "error", "failed")))
+
+    def report(self) -> Dict[str, Any]:
+        """Aggregate the spans by kind and name, by agent and by task."""
+        with self._lock:
+            spans = list(self.spans)
+
+        def aggregate(group: List[Span]) -> Dict[str, Any]:
+            durations = [span.duration for span in group]
+            tokens: Dict[str, int] = {}
+            for span in group:
+                for name, value in span.attributes.get("tokens", {}).items():
+                    if isinstance(value, (int, float)):
+                        tokens[name] = tokens.get(name, 0) + int(value)
+
+            return {
+                "count": len(group),
+                "errors": sum(1 for span in group if span.error),
+                "total_s": sum(durations),
+                "mean_s": sum(durations) / len(durations) if durations else 0.0,
+                "p95_s": percentile(durations, 95),
+                **({"tokens": tokens} if tokens else {}),
+            }
+
+        def grouped(key) -> Dict[str, Any]:
+            groups: Dict[str, List[Span]] = {}
+            for span in spans:
+                groups.setdefault(key(span), []).append(span)
+            return {name: aggregate(group) for name, group in sorted(groups.items())}
+
+        return {
+            "wall_time_s": time.time() - self.started,
+            "by_operation": grouped(lambda span: f"{span.kind}:{span.name}"),
+            "by_agent": grouped(lambda span: f"{span.kind}:{span.agent or 'unknown'}"),
+            "by_task": grouped(lambda span: f"{span.kind}:{span.task or 'unknown'}"),
+        }
+
+    def export_json(self, path: Path):
+        """Write all spans and the report as JSON."""
+        with self._lock:
+            spans = [asdict(span) | {"duration": span.duration} for span in self.spans]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "report": self.report(),
+            "spans": spans,
+        }, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+
+    def export_prometheus(self, path: Path):
+        """Write the report per operation as a Prometheus textfile."""
+        lines = [
+            "# HELP crew_span_seconds_total Time spent in crew operations.",
+            "# TYPE crew_span_seconds_total counter",
+        ]
+        counts = [
+            "# HELP crew_span_count_total Number of crew operations.",
+            "# TYPE crew_span_count_total counter",
+        ]
+
+        for operation, stats in self.report()["by_operation"].items():
+            kind, name = operation.split(":", 1)
+            labels = f'kind="{kind}",name="{name.replace(chr(34), "")}"'
+            lines.append(f"crew_span_seconds_total{{{labels}}} {stats['total_s']:.6f}")
+            counts.append(f"crew_span_count_total{{{labels}}} {stats['count']}")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text("\n".join(lines + counts) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+    def export_otlp(self, path: Path, service_name: str = "zim-research-crew"):
+        """Write the spans in the OTLP/JSON trace format."""
+        trace_id = uuid.uuid4().hex
+
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        with self._lock:
+            spans = list(self.spans)
+
+        otlp_spans = []
+        for span in spans:
+            attributes = [attribute("crew.kind", span.kind)]
+            if span.agent:
+                attributes.append(attribute("crew.agent", span.agent))
+            if span.task:
+                attributes.append(attribute("crew.task", span.task))
+            for name, value in span.attributes.get("tokens", {}).items():
+                attributes.append(attribute(f"crew.tokens.{name}", value))
+
+            otlp_spans.append({
+                "traceId": trace_id,
+                "spanId": span.span_id,
+                "name": f"{span.kind} {span.name}",
+                "kind": 1,
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int(span.end * 1e9)),
+                "attributes": attributes,
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+            }]
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def print_report(self, limit: int = 15):
+        """Print the slowest operations."""
+        operations = sorted(self.report()["by_operation"].items(), key=lambda item: item[1]["total_s"], reverse=True)
+
+        print(f"{'Operation':<60} {'Count':>6} {'Total':>10} {'Mean':>9} {'p95':>9}")
+        for operation, stats in operations[:limit]:
+            print(f"{operation[:60]:<60} {stats['count']:>6} {stats['total_s']:>9.1f}s {stats['mean_s']:>8.2f}s {stats['p95_s']:>8.2f}s")
@@ -0,0 +1,200 @@
+"""
+Streaming, batched embedding and upsert of chunks into the vector store.
+
+Chunks are collected into fixed-size batches as documents are chunked and
+handed to a background thread that embeds and stores them, while the import
+continues with the next document. The hand-off queue is bounded, so a slow
+vector store slows down the producer instead of letting chunks pile up in
+memory.
+
+Embeddings come from the inference cache where possible (see
+`crew.utils.inference_cache`), so chunks whose content was embedded
+before, e.g. by an import with a different chunking, cost no model call.
+
+Failed batches are retried with exponential backoff. A document counts as
+imported only when all its batches are stored: then its completion callback
+runs (e.g. to record it in the manifest). Chunk ids are deterministic and
+stored with upsert, so an interrupted import can simply be run again.
+"""
+
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from crew.utils.inference_cache import get_inference_cache
+from crew.utils.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+
+@dataclass(eq=False)
+class _Document:
+    """Completion bookkeeping of one document's records."""
+    pending_batches: int = 0
+    sealed: bool = False
+    on_done: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class _Batch:
+    records: List[Record] = field(default_factory=list)
+    documents: List[_Document] = field(default_factory=list)
+
+
+class BatchUpserter:
+    """
+    Upserts records in fixed-size batches on a background thread.
+
+    Use as a context manager; leaving it flushes the last batch and waits
+    for all batches to be stored.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        batch_size: int = 64,
+        max_pending_batches: int = 2,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Initialize the upserter.
+
+        Args:
+            store: Vector store (and collection) to store the records in
+            batch_size: Number of records embedded and stored at once
+            max_pending_batches: Full batches waiting before `add` blocks
+            max_retries: Retries of a failed batch before the import fails
+            retry_backoff: Seconds before the first retry, doubled each time
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.stored = 0
+        self._batch = _Batch()
+        self._queue: "queue.Queue[Optional[_Batch]]" = queue.Queue(maxsize=max_pending_batches)
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._work, name="upsert", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "BatchUpserter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        self.close(raise_errors=exc_type is None)
+
+    def add(self, records: List[Record], on_done: Optional[Callable[[], None]] = None):
+        """
+        Queue the records of one document.
+
+        Args:
+            records: Records with "doc_id", "content" and "metadata"
+            on_done: Called on the worker thread once all records are stored
+        """
+        self._raise_error()
+        document = _Document(on_done=on_done)
+
+        for record in records:
+            # Records of a document are added contiguously
+            if not self._batch.documents or self._batch.documents[-1] is not document:
+                self._batch.documents.append(document)
+                with self._lock:
+                    document.pending_batches += 1
+
+            self._batch.records.append(record)
+
+            if len(self._batch.records) >= self.batch_size:
+                self._submit()
+
+        with self._lock:
+            document.sealed = True
+            done = document.pending_batches == 0
+
+        # Documents without records are complete right away
+        if done and on_done:
+            on_done()
+
+    def close(self, raise_errors: bool = True):
+        """Flush the last batch, wait for the worker and raise its error, if any."""
+        if self._batch.records and self._error is None:
+            self._submit()
+
+        self._queue.put(None)
+        self._worker.join()
+
+        if raise_errors:
+            self._raise_error()
+
+    def _submit(self):
+        batch, self._batch = self._batch, _Batch()
+
+        # Blocks while the worker is behind (backpressure)
+        while True:
+            self._raise_error()
+            try:
+                self._queue.put(batch, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Upserting into '{self.store.collection_name}' failed") from self._error
+
+    def _work(self):
+        while True:
+            batch = self._queue.get()
+
+            if batch is None:
+                return
+            if self._error is not None:
+                continue
+
+            try:
+                self._upsert(batch.records)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch.records)} chunks failed permanently: {e}")
+                self._error = e
+                continue
+
+            self.stored += len(batch.records)
+
+            for document in batch.documents:
+                with self._lock:
+                    document.pending_batches -= 1
+                    done = document.sealed and document.pending_batches == 0
+
+                if done and document.on_done:
+                    try:
+                        document.on_done()
+                    except Exception as e:
+                        logger.error(f"Completion callback failed: {e}")
+                        self._error = e
+
+    def _upsert(self, records: List[Record]):
+        texts = [record["content"] for record in records]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                embeddings = get_inference_cache().embed(texts, self.store.embedding_function)
+                self.store.upsert(
+                    [record["doc_id"] for record in records],
+                    texts,
+                    [record.get("metadata") or {} for record in records],
+                    embeddings,
+                )
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"Upserting {len(records)} chunks failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
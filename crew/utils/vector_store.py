@@ -0,0 +1,448 @@
+"""
+Pluggable vector store for the knowledge collection.
+
+The import, the document search and the chunk store used to talk to the
+RAG client and to the raw ChromaDB client behind it. They now go through
+`VectorStore`, which has two implementations:
+
+- `ChromaVectorStore`: the ChromaDB collection of the crewAI RAG client,
+  as before.
+- `QdrantVectorStore`: a Qdrant collection, embedded and stored on disk
+  (`QDRANT_PATH`) or on a Qdrant server (`QDRANT_URL`). It creates payload
+  indexes on `filename`, `chunk_index`, `page_no` and `title`, so
+  metadata-filtered lookups and neighbour ranges are served by the index.
+  Embedded Qdrant ignores payload indexes and filters by scanning, so the
+  chunk store keeps its in-memory copy there (see `indexed`).
+
+Both use the embedding function of the RAG configuration, and both report
+similarities in [0, 1] as `(1 + cosine) / 2`, so the score thresholds of
+the document search apply to either.
+
+Configuration via environment variables:
+
+- VECTOR_STORE: chroma (default) or qdrant
+- QDRANT_PATH: directory of the embedded Qdrant store (default: knowledge/.qdrant)
+- QDRANT_URL: URL of a Qdrant server, used instead of the embedded store
+- QDRANT_API_KEY: API key of the Qdrant server
+"""
+
+import os
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("chroma", "qdrant")
+DEFAULT_COLLECTION = "knowledge"
+ITER_BATCH_SIZE = 1000
+INDEXED_FIELDS = {"filename": "keyword", "chunk_index": "integer", "page_no": "integer", "title": "keyword"}
+
+Chunk = Dict[str, Any]
+
+
+@dataclass
+class VectorStoreConfig:
+    """Configuration for the vector store."""
+    backend: str = "chroma"  # One of BACKENDS
+    qdrant_path: str = "knowledge/.qdrant"
+    qdrant_url: Optional[str] = None
+    qdrant_api_key: Optional[str] = None
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown vector store '{self.backend}', expected one of {', '.join(BACKENDS)}")
+
+    @classmethod
+    def from_env(cls) -> "VectorStoreConfig":
+        """Create a configuration from VECTOR_STORE and QDRANT_* environment variables."""
+        return cls(
+            backend=os.getenv("VECTOR_STORE", cls.backend).lower(),
+            qdrant_path=os.getenv("QDRANT_PATH", cls.qdrant_path),
+            qdrant_url=os.getenv("QDRANT_URL") or None,
+            qdrant_api_key=os.getenv("QDRANT_API_KEY") or None,
+        )
+
+
+def _cosine_similarity_score(cosine: float) -> float:
+    """Similarity in [0, 1] of a cosine similarity."""
+    return max(0.0, min(1.0, (1.0 + cosine) / 2))
+
+
+def _chroma_similarity_score(distance: float, metric: str) -> float:
+    """Similarity in [0, 1] of a ChromaDB distance, as the RAG client's search computes it."""
+    if metric == "cosine":
+        return _cosine_similarity_score(1.0 - distance)
+    return max(0.0, min(1.0, 1.0 / (1.0 + distance)))
+
+
+class VectorStore(ABC):
+    """
+    A collection of chunks with content, metadata and embedding.
+    """
+
+    name: str = ""
+
+    def __init__(self, collection_name: str = DEFAULT_COLLECTION):
+        from crewai.rag.config.utils import get_rag_config
+
+        self.collection_name = collection_name
+        self.embedding_function = get_rag_config().embedding_function
+
+    @property
+    def indexed(self) -> bool:
+        """Whether `window` and `get` are served by an index instead of a scan."""
+        return False
+
+    @abstractmethod
+    def create(self):
+        """Create the collection if it does not exist."""
+
+    @abstractmethod
+    def drop(self):
+        """Delete the collection with all chunks."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of chunks, 0 if the collection does not exist."""
+
+    @abstractmethod
+    def upsert(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]):
+        """Insert or replace chunks."""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Delete chunks by id."""
+
+    @abstractmethod
+    def search(self, embeddings: List[List[float]], limit: int) -> List[List[Chunk]]:
+        """
+        Nearest chunks per query embedding.
+
+        Returns:
+            Per query, up to `limit` chunks with "id", "content", "metadata" and "score", best first
+        """
+
+    @abstractmethod
+    def iter_chunks(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (id, content, metadata) of every chunk."""
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> List[Chunk]:
+        """Chunks with the given ids, missing ones are left out."""
+
+    @abstractmethod
+    def window(self, filename: str, first: int, last: int) -> List[Chunk]:
+        """Chunks of a document with `first <= chunk_index <= last`, in index order."""
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    The ChromaDB collection of the crewAI RAG client.
+    """
+
+    name = "chroma"
+
+    def __init__(self, collection_name: str = DEFAULT_COLLECTION):
+        from crewai.rag.config.utils import get_rag_client
+
+        super().__init__(collection_name)
+        self.client = get_rag_client()
+        self.embedding_function = self.client.embedding_function
+        self._collection: Any = None
+
+    @property
+    def collection(self) -> Any:
+        if self._collection is None:
+            self._collection = self.client.client.get_collection(
+                name=self.collection_name, embedding_function=self.embedding_function)
+        return self._collection
+
+    def create(self):
+        # The RAG client sets the distance metric of the collection
+        self.client.get_or_create_collection(collection_name=self.collection_name)
+        self._collection = None
+
+    def drop(self):
+        self._collection = None
+        self.client.delete_collection(collection_name=self.collection_name)
+
+    def count(self) -> int:
+        try:
+            return self.collection.count()
+        except Exception:
+            return 0
+
+    def upsert(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]):
+        self.collection.upsert(ids=ids, documents=contents, metadatas=[metadata or {} for metadata in metadatas], embeddings=embeddings)
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def search(self, embeddings: List[List[float]], limit: int) -> List[List[Chunk]]:
+        metric = (self.collection.metadata or {}).get("hnsw:space", "cosine")
+        response = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=limit,
+            include=["documents", "metadatas", "distances"],
+        )
+
+        return [
+            [{
+                "id": chunk_id,
+                "content": content,
+                "metadata": metadata or {},
+                "score": _chroma_similarity_score(distance, metric),
+            } for chunk_id, content, metadata, distance in zip(ids, contents, metadatas, distances)]
+            for ids, contents, metadatas, distances in zip(
+                response["ids"],
+                response["documents"] or [],
+                response["metadatas"] or [],
+                response["distances"] or [],
+            )
+        ]
+
+    def iter_chunks(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        offset = 0
+
+        while True:
+            result = self.collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            ids = result.get("ids") or []
+
+            yield from zip(ids, result.get("documents") or [], [metadata or {} for metadata in result.get("metadatas") or []])
+
+            if len(ids) < batch_size:
+                return
+            offset += batch_size
+
+    def get(self, ids: List[str]) -> List[Chunk]:
+        result = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return [
+            {"id": chunk_id, "content": content, "metadata": metadata or {}}
+            for chunk_id, content, metadata in zip(result.get("ids") or [], result.get("documents") or [], result.get("metadatas") or [])
+        ]
+
+    def window(self, filename: str, first: int, last: int) -> List[Chunk]:
+        result = self.collection.get(
+            where={"$and": [
+                {"filename": filename},
+                {"chunk_index": {"$gte": first}},
+                {"chunk_index": {"$lte": last}},
+            ]},
+            include=["documents", "metadatas"],
+        )
+        chunks = [
+            {"id": chunk_id, "content": content, "metadata": metadata or {}}
+            for chunk_id, content, metadata in zip(result.get("ids") or [], result.get("documents") or [], result.get("metadatas") or [])
+        ]
+        return sorted(chunks, key=lambda chunk: chunk["metadata"].get("chunk_index", 0))
+
+
+# Embedded Qdrant locks its directory, so all stores of a process share one client per location
+_QDRANT_CLIENTS: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+_QDRANT_CLIENTS_LOCK = threading.Lock()
+
+# Payload keys of the chunk id and content, next to the metadata fields
+ID_KEY = "_chunk_id"
+CONTENT_KEY = "_content"
+
+
+def _qdrant_client(config: VectorStoreConfig) -> Any:
+    from qdrant_client import QdrantClient
+
+    key = (config.qdrant_url, None if config.qdrant_url else config.qdrant_path)
+
+    with _QDRANT_CLIENTS_LOCK:
+        if key not in _QDRANT_CLIENTS:
+            if config.qdrant_url:
+                _QDRANT_CLIENTS[key] = QdrantClient(url=config.qdrant_url, api_key=config.qdrant_api_key)
+            else:
+                os.makedirs(config.qdrant_path, exist_ok=True)
+                _QDRANT_CLIENTS[key] = QdrantClient(path=config.qdrant_path)
+        return _QDRANT_CLIENTS[key]
+
+
+def _point_id(chunk_id: str) -> str:
+    """Qdrant point ids are UUIDs, derived deterministically from the chunk id."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, chunk_id))
+
+
+def _chunk(point: Any) -> Chunk:
+    payload = dict(point.payload or {})
+    chunk_id = payload.pop(ID_KEY, str(point.id))
+    content = payload.pop(CONTENT_KEY, "")
+    return {"id": chunk_id, "content": content, "metadata": payload}
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    A Qdrant collection with cosine distance and payload indexes on the chunk metadata.
+
+    The collection is created with the first upsert, when the embedding
+    size is known.
+    """
+
+    name = "qdrant"
+
+    def __init__(self, config: VectorStoreConfig, collection_name: str = DEFAULT_COLLECTION):
+        super().__init__(collection_name)
+        self.config = config
+        self.client = _qdrant_client(config)
+
+    @property
+    def indexed(self) -> bool:
+        return self.config.qdrant_url is not None
+
+    def _exists(self) -> bool:
+        return self.client.collection_exists(self.collection_name)
+
+    def create(self):
+        # Deferred to the first upsert, which knows the vector size
+        pass
+
+    def _create(self, size: int):
+        from qdrant_client import models
+
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(size=size, distance=models.Distance.COSINE),
+        )
+
+        if self.indexed:
+            for field_name, schema in INDEXED_FIELDS.items():
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType(schema),
+                )
+
+    def drop(self):
+        if self._exists():
+            self.client.delete_collection(collection_name=self.collection_name)
+
+    def count(self) -> int:
+        if not self._exists():
+            return 0
+        return self.client.count(collection_name=self.collection_name, exact=True).count
+
+    def upsert(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]):
+        from qdrant_client import models
+
+        if not ids:
+            return
+        if not self._exists():
+            self._create(len(embeddings[0]))
+
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[
+                models.PointStruct(
+                    id=_point_id(chunk_id),
+                    vector=[float(x) for x in embedding],
+                    payload={**(metadata or {}), ID_KEY: chunk_id, CONTENT_KEY: content},
+                )
+                for chunk_id, content, metadata, embedding in zip(ids, contents, metadatas, embeddings)
+            ],
+        )
+
+    def delete(self, ids: List[str]):
+        from qdrant_client import models
+
+        if ids and self._exists():
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=[_point_id(chunk_id) for chunk_id in ids]),
+            )
+
+    def search(self, embeddings: List[List[float]], limit: int) -> List[List[Chunk]]:
+        from qdrant_client import models
+
+        if not self._exists():
+            return [[] for _ in embeddings]
+
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                models.QueryRequest(query=[float(x) for x in embedding], limit=limit, with_payload=True)
+                for embedding in embeddings
+            ],
+        )
+
+        return [
+            [{**_chunk(point), "score": _cosine_similarity_score(point.score)} for point in response.points]
+            for response in responses
+        ]
+
+    def iter_chunks(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        if not self._exists():
+            return
+
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name, limit=batch_size, offset=offset, with_payload=True)
+
+            for point in points:
+                chunk = _chunk(point)
+                yield chunk["id"], chunk["content"], chunk["metadata"]
+
+            if offset is None:
+                return
+
+    def get(self, ids: List[str]) -> List[Chunk]:
+        if not ids or not self._exists():
+            return []
+
+        points = self.client.retrieve(
+            collection_name=self.collection_name, ids=[_point_id(chunk_id) for chunk_id in ids], with_payload=True)
+        return [_chunk(point) for point in points]
+
+    def window(self, filename: str, first: int, last: int) -> List[Chunk]:
+        from qdrant_client import models
+
+        if last < first or not self._exists():
+            return []
+
+        points, _ = self.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=models.Filter(must=[
+                models.FieldCondition(key="filename", match=models.MatchValue(value=filename)),
+                models.FieldCondition(key="chunk_index", range=models.Range(gte=first, lte=last)),
+            ]),
+            limit=last - first + 1,
+            with_payload=True,
+        )
+        chunks = [_chunk(point) for point in points]
+        return sorted(chunks, key=lambda chunk: chunk["metadata"].get("chunk_index", 0))
+
+
+def create_vector_store(config: VectorStoreConfig, collection_name: str = DEFAULT_COLLECTION) -> VectorStore:
+    """Vector store of the configured backend for a collection."""
+    if config.backend == "qdrant":
+        return QdrantVectorStore(config, collection_name)
+    return ChromaVectorStore(collection_name)
+
+
+_VECTOR_STORE: Optional[VectorStore] = None
+_VECTOR_STORE_LOCK = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """Return the process-wide store of the "knowledge" collection, configured from the environment."""
+    global _VECTOR_STORE
+
+    if _VECTOR_STORE is None:
+        with _VECTOR_STORE_LOCK:
+            if _VECTOR_STORE is None:
+                _VECTOR_STORE = create_vector_store(VectorStoreConfig.from_env())
+
+    return _VECTOR_STORE
@@ -0,0 +1,237 @@
+"""
+Disk-backed HTTP cache for the web search and scrape tools.
+
+The state-of-the-art research is the longest task of a run, and most of
+it is spent waiting for the network: the same search queries and pages are
+requested again within a run and in every following run. `WebClient` keeps
+responses in `.cache/web/` and shares one pooled `requests.Session`:
+
+- GET responses are served from disk while younger than the TTL. Older ones
+  are revalidated with If-None-Match / If-Modified-Since, and a 304 only
+  refreshes their timestamp.
+- POST requests (the Serper API) are cached by URL and JSON payload for the
+  TTL, credentials in the headers are not part of the key.
+- `get_many` fetches several URLs concurrently.
+
+Configuration via environment variables:
+
+- WEB_CACHE_DIR: cache directory (default: .cache/web)
+- WEB_CACHE_TTL: seconds a response is served without revalidation, 0 disables the cache
+- WEB_CONCURRENCY: maximum number of concurrent requests and pooled connections
+- WEB_TIMEOUT: request timeout in seconds
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TEXT_CONTENT_TYPES = ("text/", "application/xhtml", "application/xml", "application/json")
+
+
+@dataclass
+class WebCacheConfig:
+    """Configuration for the web cache."""
+    directory: Path = Path(".cache/web")
+    ttl_seconds: float = 86400.0
+    concurrency: int = 8
+    timeout: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "WebCacheConfig":
+        """Create a configuration from WEB_* environment variables."""
+        return cls(
+            directory=Path(os.getenv("WEB_CACHE_DIR", str(cls.directory))),
+            ttl_seconds=float(os.getenv("WEB_CACHE_TTL", cls.ttl_seconds)),
+            concurrency=int(os.getenv("WEB_CONCURRENCY", cls.concurrency)),
+            timeout=float(os.getenv("WEB_TIMEOUT", cls.timeout)),
+        )
+
+
+@dataclass
+class CachedResponse:
+    """A response body with the validators needed to revalidate it."""
+    url: str
+    status: int
+    text: str
+    content_type: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched: float = 0.0
+    from_cache: bool = False
+
+
+class WebClient:
+    """
+    Pooled HTTP session with a disk cache, one JSON file per response.
+    """
+
+    def __init__(self, config: WebCacheConfig):
+        self.config = config
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.concurrency, pool_maxsize=config.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _path(self, key: str) -> Path:
+        return self.config.directory / key[:2] / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        if self.config.ttl_seconds <= 0:
+            return None
+
+        try:
+            return CachedResponse(**json.loads(self._path(key).read_text(encoding="utf-8")))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def _store(self, key: str, response: CachedResponse):
+        if self.config.ttl_seconds <= 0:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(response) | {"from_cache": False}, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def _fresh(self, cached: Optional[CachedResponse]) -> bool:
+        return cached is not None and time.time() - cached.fetched < self.config.ttl_seconds
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """
+        GET `url`, served from the cache or revalidated when possible.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        key = hashlib.sha256(f"GET\0{url}".encode("utf-8")).hexdigest()
+        cached = self._load(key)
+
+        if self._fresh(cached):
+            self._count("hits")
+            return CachedResponse(**asdict(cached) | {"from_cache": True})  # type: ignore[arg-type]
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached.etag:
+                request_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request_headers["If-Modified-Since"] = cached.last_modified
+
+        response = self.session.get(url, headers=request_headers, timeout=self.config.timeout)
+
+        if response.status_code == 304 and cached is not None:
+            self._count("revalidated")
+            cached.fetched = time.time()
+            self._store(key, cached)
+            return CachedResponse(**asdict(cached) | {"from_cache": True})
+
+        response.raise_for_status()
+        self._count("misses")
+
+        content_type = response.headers.get("Content-Type", "")
+        if not content_type or content_type.startswith(TEXT_CONTENT_TYPES):
+            response.encoding = response.apparent_encoding
+            text = response.text
+        else:
+            text = ""
+
+        result = CachedResponse(
+            url=url,
+            status=response.status_code,
+            text=text,
+            content_type=content_type,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched=time.time(),
+        )
+        self._store(key, result)
+        return result
+
+    def get_many(self, urls: List[str], headers: Optional[Dict[str, str]] = None) -> List[Union[CachedResponse, Exception]]:
+        """GET several URLs concurrently, failed requests are returned as their exception."""
+        def fetch(url: str) -> Union[CachedResponse, Exception]:
+            try:
+                return self.get(url, headers=headers)
+            except Exception as e:
+                logger.warning(f"Fetching {url} failed: {e}")
+                return e
+
+        if len(urls) <= 1:
+            return [fetch(url) for url in urls]
+
+        with ThreadPoolExecutor(max_workers=min(len(urls), self.config.concurrency)) as executor:
+            return list(executor.map(fetch, urls))
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        POST a JSON payload and return the decoded JSON response, cached for the TTL.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(f"POST\0{url}\0{body}".encode("utf-8")).hexdigest()
+        cached = self._load(key)
+
+        if self._fresh(cached):
+            self._count("hits")
+            return json.loads(cached.text)  # type: ignore[union-attr]
+
+        response = self.session.post(url, json=payload, headers=headers, timeout=self.config.timeout)
+        response.raise_for_status()
+        self._count("misses")
+
+        result = response.json()
+        self._store(key, CachedResponse(
+            url=url,
+            status=response.status_code,
+            text=response.text,
+            content_type=response.headers.get("Content-Type", ""),
+            fetched=time.time(),
+        ))
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+
+_CLIENT: Optional[WebClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_web_client() -> WebClient:
+    """Return the process-wide web client."""
+    global _CLIENT
+
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = WebClient(WebCacheConfig.from_env())
+
+    return _CLIENT
@@ -0,0 +1,83 @@
+"""
+Local HTTP stand-in for the Serper API and the scraped websites.
+
+Answers `POST /search` and `POST /news` with Serper-shaped results that
+link back to pages of this server, and `GET` on any other path with a
+small HTML page. Pages carry an ETag and Last-Modified header and answer
+conditional requests with 304, so the web cache can be exercised offline:
+
+    python -m crew.utils.web_stub --port 8765
+    SERPER_BASE_URL=http://localhost:8765 uv run main.py kickoff
+"""
+
+import json
+import hashlib
+from email.utils import formatdate
+from typing import Dict, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length) or b"{}").get("q", "")
+        base_url = f"http://{self.headers.get('Host')}"
+        results = [{
+            "title": f"Result {number} for {query}",
+            "link": f"{base_url}/page/{number}",
+            "snippet": f"Stand-in result {number} about {query}.",
+            "position": number,
+        } for number in range(1, 4)]
+
+        key = "news" if self.path.rstrip("/").endswith("news") else "organic"
+        body = json.dumps({"searchParameters": {"q": query}, key: results, "credits": 1}).encode("utf-8")
+        self._send(200, body, {"Content-Type": "application/json"})
+
+    def do_GET(self):
+        body = (
+            f"<html><head><title>{self.path}</title><script>var tracking = 1;</script></head><body>"
+            f"<nav>Home | About</nav><main><h1>Stand-in page {self.path}</h1>"
+            f"<p>Static content of {self.path} for offline runs.</p></main>"
+            f"<footer>Imprint</footer></body></html>"
+        ).encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+            return
+
+        self._send(200, body, {
+            "Content-Type": "text/html; charset=utf-8",
+            "ETag": etag,
+            "Last-Modified": LAST_MODIFIED,
+        })
+
+
+@click.command()
+@click.option('--host', default="127.0.0.1", show_default=True, help='Interface to listen on')
+@click.option('--port', default=8765, show_default=True, type=click.INT, help='Port to listen on')
+def main(host: str, port: int):
+    """Serve the stand-in until interrupted."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
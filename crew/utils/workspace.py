@@ -0,0 +1,89 @@
+"""
+Helpers for partial reads and writes of workspace files.
+
+Agents mostly add or revise a single section of a Markdown file such as
+`intake.md` or `project_description.md`. Reading and re-emitting the whole
+document for that costs input and output tokens on every edit, so the
+workspace tools can address a line range, a byte range or a heading
+section, and append or replace parts of a file.
+
+A section starts at its heading and ends before the next heading of the
+same or a higher level. Headings inside fenced code blocks are ignored.
+All writes go to a temporary file that replaces the target, so readers
+never see a partially written file.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+WORKSPACE_DIR = Path("workspace")
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+
+
+def normalize_heading(heading: str) -> str:
+    """Heading text without the leading hashes, whitespace and case."""
+    return " ".join(heading.strip().lstrip("#").split()).casefold()
+
+
+def headings(text: str) -> List[Tuple[int, str, int]]:
+    """
+    Markdown headings of `text`.
+
+    Returns:
+        (level, title, character offset of the heading line) per heading
+    """
+    found = []
+    offset = 0
+    in_fence = False
+
+    for line in text.splitlines(keepends=True):
+        stripped = line.rstrip("\r\n")
+
+        if FENCE_PATTERN.match(stripped):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = HEADING_PATTERN.match(stripped)
+            if match:
+                found.append((len(match.group(1)), match.group(2), offset))
+
+        offset += len(line)
+
+    return found
+
+
+def find_section(text: str, heading: str) -> Optional[Tuple[int, int]]:
+    """
+    Character span of the section with the given heading, None if there is none.
+
+    The first matching heading wins.
+    """
+    wanted = normalize_heading(heading)
+    all_headings = headings(text)
+
+    for number, (level, title, start) in enumerate(all_headings):
+        if normalize_heading(title) != wanted:
+            continue
+
+        end = next((offset for next_level, _, offset in all_headings[number + 1:] if next_level <= level), len(text))
+        return start, end
+
+    return None
+
+
+def atomic_write(path: Path, text: str):
+    """Write `text` to a temporary file next to `path` and move it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -1,96 +1,168 @@
 #!.venv/bin/python
 import sys
+import json
 import asyncio
-import requests
-import shutil
+import threading
 
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from uuid import uuid4
 
 import logging
 import click
+import yaml
 
-from crewai import LLM
-from crewai.rag.config.utils import get_rag_client
 from crewai.utilities.constants import KNOWLEDGE_DIRECTORY
 from crew.crew import ProjectResearchCrew
+from crew.utils.bench import DEFAULT_QUERIES, load_queries, run_ingestion_bench, run_reranker_bench, run_retrieval_bench
 from crew.utils.chunker import create_chunker, ChunkingConfig
+from crew.utils.conversion import convert_documents, default_workers
+from crew.utils.document_cache import DOCUMENT_CACHE_DIRNAME, DocumentCache
+from crew.utils.downloads import download_files
+from crew.utils.inference_cache import get_inference_cache
+from crew.utils.lexical_index import INDEX_DIRNAME, LexicalIndex
+from crew.utils.llm_cache import MODES, configure_llm_cache
+from crew.utils.mcp_pool import close_mcp_pools
+from crew.utils.reranker import BACKENDS as RERANKER_BACKENDS, RerankerConfig
+from crew.utils.summaries import SummaryGenerator, prune_summary_cache
+from crew.utils.tracing import PerformanceTracer
+from crew.utils.upsert import BatchUpserter
+from crew.utils.vector_store import BACKENDS as VECTOR_STORE_BACKENDS, VectorStoreConfig, get_vector_store
+from crew.utils.manifest import (
+    MANIFEST_FILENAME,
+    KnowledgeManifest,
+    ManifestEntry,
+    chunk_id,
+    hash_file,
+    hash_text,
+    write_collection_version,
+)
 
 from docling.document_converter import DocumentConverter
 from docling_core.types.doc import DoclingDocument
-from textwrap import dedent
-import subprocess
-import tempfile
 
 logger = logging.getLogger(__name__)
 
 if not Path("workspace/intake.md").exists():
     Path("workspace/intake.md").write_text(Path("intake.example.md").read_text(encoding='utf-8'), encoding='utf-8')
 
+KNOWLEDGE_URLS = {
+    "Förderrichtlinie Zentrales Innovationsprogramm Mittelstand.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Richtlinien/richtlinie-zim-2025.pdf?__blob=publicationFile&v=7",
+    "Förderrichtlinie Zentrales Innovationsprogramm Mittelstand - Kerninhalt.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Richtlinien/richtlinie-zim-2025-kerninhalt.pdf?__blob=publicationFile&v=5",
+    "Richtlinie zur Förderung von Transformationsprojekten.pdf": "https://www.bibb.de/dokumente/pdf/BAnz%20AT%2028.11.2024%20B1.pdf",
+    "Bundeshaushaltsordnung.pdf": "https://www.gesetze-im-internet.de/bho/BHO.pdf",
+    "Allgemeine Verwaltungsvorschriften zur Bundeshaushaltsordnung.pdf": "https://www.esf.de/portal/SharedDocs/PDFs/DE/Recht_VO/FP-2014-2020/vv_bho_44.pdf?__blob=publicationFile&v=1",
+    "Allgemeine Nebenbestimmungen für Zuwendungen zur Projektförderung auf Kostenbasis (ANBest-P-Kosten).pdf": "https://www.bva.bund.de/SharedDocs/Downloads/DE/Aufgaben/ZMV/Zuwendungen_national/nebenbestimmungen_anbest_p_kosten_2025.pdf?__blob=publicationFile&v=4",
+    "Hinweise für Antragsteller.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/B_Kooperationsprojekt/B1_Ohne-Netzwerk/Downloads/hinweise-fuer-antragstellung-koop.pdf?__blob=publicationFile&v=2",
+    "Hilfestellung zum Ausfüllen der Formulare.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/B_Kooperationsprojekt/B1_Ohne-Netzwerk/Downloads/formular-hilfe-koop.pdf?__blob=publicationFile&v=2",
+    "Beispiele für Leistungen zur Markteinführung.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/beispiele-fuer-leistungen-zur-markteinfuehrung_2020.pdf?__blob=publicationFile&v=1",
+    "Informationblatt - Einstufung von Unternehmen.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/A_Einzelprojekt/B2_Mit-Netzwerk/Downloads/unternehmenstyp.pdf?__blob=publicationFile&v=1",
+}
+
+
+def llm_cache_options(command):
+    """Options selecting the LLM cache mode, see crew.utils.llm_cache."""
+    command = click.option('--llm-cache', 'llm_cache_mode', type=click.Choice(MODES), default=None, help='LLM cache mode (default: LLM_CACHE_MODE or off)')(command)
+    command = click.option('--record', 'llm_cache_mode', flag_value='record', help='Call the LLMs and record all responses')(command)
+    command = click.option('--replay', 'llm_cache_mode', flag_value='replay', help='Only serve recorded LLM responses, fail on unknown prompts')(command)
+    return command
+
+
 @click.command()
-def kickoff():
+@llm_cache_options
+@click.option('--trace', 'trace_path', type=click.Path(dir_okay=False, path_type=Path), default=None, help='JSON trace file (default: workspace/traces/<timestamp>.json)')
+@click.option('--prometheus', 'prometheus_path', type=click.Path(dir_okay=False, path_type=Path), default=None, help='Also write the report as Prometheus textfile')
+@click.option('--otlp', 'otlp_path', type=click.Path(dir_okay=False, path_type=Path), default=None, help='Also write the spans as OTLP/JSON file')
+@click.option('--max-parallel-tasks', default=None, type=click.IntRange(min=1), help='Maximum number of independent tasks running at the same time')
+@click.option('--resume', is_flag=True, help='Skip tasks whose checkpoint is still valid and continue with the first invalidated task')
+def kickoff(llm_cache_mode: str | None, trace_path: Path | None, prometheus_path: Path | None, otlp_path: Path | None, max_parallel_tasks: int | None, resume: bool):
     """
     Run the crew.
+
+    Every completed task is checkpointed. With --resume, tasks whose
+    configuration, context and workspace inputs did not change since their
+    checkpoint are skipped.
     """
+    if llm_cache_mode:
+        configure_llm_cache(llm_cache_mode)
+
+    started = datetime.now()
+    tracer = PerformanceTracer()
+
+    project_crew = ProjectResearchCrew()
+    if max_parallel_tasks:
+        project_crew.max_parallel_tasks = max_parallel_tasks
+    project_crew.resume = resume
+
+    crew_instance = project_crew.crew()
+    checkpoints = project_crew.checkpoints
 
-    output = ProjectResearchCrew().crew().kickoff(inputs={
-        "current_date": datetime.now().strftime("%Y-%m-%d"),
-    })
+    if not checkpoints.pending:
+        print("All tasks are up to date, nothing to do.")
+        final_output = checkpoints.final_output()
+        if final_output is not None:
+            print(final_output.raw)
+        return
+    if checkpoints.skipped:
+        print(f"Resuming at {checkpoints.pending[0].name}, skipping {', '.join(task.name for task in checkpoints.skipped)}")
+
+    try:
+        output = crew_instance.kickoff(inputs={
+            "current_date": started.strftime("%Y-%m-%d"),
+        })
+    finally:
+        close_mcp_pools()
+        tracer.print_report()
+        trace_path = trace_path or Path("workspace/traces") / f"{started.strftime('%Y%m%d-%H%M%S')}.json"
+        tracer.export_json(trace_path)
+        print(f"Trace written to {trace_path}")
+
+        if prometheus_path:
+            tracer.export_prometheus(prometheus_path)
+        if otlp_path:
+            tracer.export_otlp(otlp_path)
     
     print(f"Token Usage: {output.token_usage}")
 
 @click.command()
-def download_knowledge():
+@click.option('--sources', 'sources_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None, help='YAML file mapping filenames to URLs (default: the built-in list)')
+@click.option('--workers', '-w', default=4, show_default=True, type=click.IntRange(min=1), help='Number of concurrent downloads')
+@click.option('--compress-workers', default=default_workers(), show_default=True, type=click.IntRange(min=1), help='Number of Ghostscript processes recompressing PDFs')
+@click.option('--force', is_flag=True, help='Download and recompress all files, even if they did not change')
+def download_knowledge(sources_path: Path | None, workers: int, compress_workers: int, force: bool):
     """
     Download knowledge files into the knowledge directory.
-    """
-    url_map = {
-        "Förderrichtlinie Zentrales Innovationsprogramm Mittelstand.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Richtlinien/richtlinie-zim-2025.pdf?__blob=publicationFile&v=7",
-        "Förderrichtlinie Zentrales Innovationsprogramm Mittelstand - Kerninhalt.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Richtlinien/richtlinie-zim-2025-kerninhalt.pdf?__blob=publicationFile&v=5",
-        "Richtlinie zur Förderung von Transformationsprojekten.pdf": "https://www.bibb.de/dokumente/pdf/BAnz%20AT%2028.11.2024%20B1.pdf",
-        "Bundeshaushaltsordnung.pdf": "https://www.gesetze-im-internet.de/bho/BHO.pdf",
-        "Allgemeine Verwaltungsvorschriften zur Bundeshaushaltsordnung.pdf": "https://www.esf.de/portal/SharedDocs/PDFs/DE/Recht_VO/FP-2014-2020/vv_bho_44.pdf?__blob=publicationFile&v=1",
-        "Allgemeine Nebenbestimmungen für Zuwendungen zur Projektförderung auf Kostenbasis (ANBest-P-Kosten).pdf": "https://www.bva.bund.de/SharedDocs/Downloads/DE/Aufgaben/ZMV/Zuwendungen_national/nebenbestimmungen_anbest_p_kosten_2025.pdf?__blob=publicationFile&v=4",
-        "Hinweise für Antragsteller.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/B_Kooperationsprojekt/B1_Ohne-Netzwerk/Downloads/hinweise-fuer-antragstellung-koop.pdf?__blob=publicationFile&v=2",
-        "Hilfestellung zum Ausfüllen der Formulare.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/B_Kooperationsprojekt/B1_Ohne-Netzwerk/Downloads/formular-hilfe-koop.pdf?__blob=publicationFile&v=2",
-        "Beispiele für Leistungen zur Markteinführung.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/beispiele-fuer-leistungen-zur-markteinfuehrung_2020.pdf?__blob=publicationFile&v=1",
-        "Informationblatt - Einstufung von Unternehmen.pdf": "https://www.zim.de/ZIM/Redaktion/DE/Downloads/Formularcenter/A_Phase-Antrag/A_Einzelprojekt/B2_Mit-Netzwerk/Downloads/unternehmenstyp.pdf?__blob=publicationFile&v=1",
-    }
-
-    for filename, url in url_map.items():
-        print(url)
-
-        path = f"knowledge/{filename}"
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
 
-        with open(path, "wb") as f:
-            f.write(response.content)
+    Only new or changed files are downloaded and recompressed, see
+    crew.utils.downloads.
+    """
+    urls = yaml.safe_load(sources_path.read_text(encoding="utf-8")) if sources_path else KNOWLEDGE_URLS
+    stats = download_files(urls, Path(KNOWLEDGE_DIRECTORY), workers=workers, compress_workers=compress_workers, force=force)
 
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp_path = tmp.name
-        
-        # TODO replace subprocess
-        # with pikepdf.open(path) as pdf:
-        #     pdf.save(tmp_path, compression=pikepdf.CompressionLevel.prepress)
-
-        subprocess.run([
-            "gs",
-            "-o", tmp_path,
-            "-sDEVICE=pdfwrite",
-            "-dPDFSETTINGS=/prepress",
-            path
-        ], check=True)
-        
-        shutil.move(tmp_path, path)
+    print(f"Downloaded: {stats['downloaded']}, unchanged: {stats['unchanged']}, failed: {stats['failed']}")
+    if stats["failed"]:
+        sys.exit(1)
 
 
 @click.command()
-def import_knowledge():
+@llm_cache_options
+@click.option('--full', is_flag=True, help='Drop the collection and re-import all files instead of only new or changed ones')
+@click.option('--rechunk', is_flag=True, help='Chunk and store all files again, e.g. after changing the chunking, converted documents come from the cache')
+@click.option('--workers', '-w', default=default_workers(), show_default=True, type=click.IntRange(min=1), help='Number of processes converting documents in parallel')
+@click.option('--summary-concurrency', default=4, show_default=True, type=click.IntRange(min=1), help='Maximum number of summaries generated at the same time')
+@click.option('--batch-size', default=64, show_default=True, type=click.IntRange(min=1), help='Number of chunks embedded and stored at once')
+def import_knowledge(llm_cache_mode: str | None, full: bool, rechunk: bool, workers: int, summary_concurrency: int, batch_size: int):
     """
     Consume knowledge into the crew's knowledge storage.
+
+    Only files that are new or changed since the last import are converted
+    and embedded again, chunks of removed files are deleted. An interrupted
+    import continues with the files that were not completely stored.
+    Converted documents are cached, so re-chunking does not convert again.
     """
+    if llm_cache_mode:
+        configure_llm_cache(llm_cache_mode)
+
     if hasattr(sys.stdout, "reconfigure"):
         sys.stdout.reconfigure(encoding='utf-8') # type: ignore
     if hasattr(sys.stderr, "reconfigure"):
@@ -101,7 +173,7 @@ def import_knowledge():
     file_paths = [
         str(p) for p in knowledge_dir.rglob("*") 
         if p.is_file() 
-            and not p.name.startswith(".") 
+            and not any(part.startswith(".") for part in p.relative_to(knowledge_dir).parts)
             and not p.name.endswith(".summary.md")]
 
     allowed_suffixes = {fmt.value for fmt in converter.allowed_formats}
@@ -121,54 +193,64 @@ def import_knowledge():
         for f in ignored_files:
             print(f"  - {f}")
 
-    if not valid_files:
-        print("No valid files found for import.")
-        return
+    store = get_vector_store()
+    manifest = KnowledgeManifest.load(knowledge_dir / MANIFEST_FILENAME)
 
-    conv_results_iter = list(converter.convert_all(valid_files))
-    content = [result.document for result in conv_results_iter]
+    if full:
+        try:
+            store.drop()
+        except Exception as e:
+            logger.debug(f"Collection deletion failed: {e}")
+        manifest.entries.clear()
 
-    client = get_rag_client()
+    store.create()
 
-    try:
-        client.delete_collection(collection_name="knowledge")
-    except Exception as e:
-        logger.debug(f"Collection deletion failed: {e}")
+    # E.g. after switching VECTOR_STORE, the manifest describes another store
+    if manifest.entries and store.count() == 0:
+        print("The vector store is empty, importing all files.")
+        manifest.entries.clear()
 
-    chunker = create_chunker(ChunkingConfig())
-    chunks = []
+    sources = {Path(path).relative_to(knowledge_dir).as_posix(): path for path in valid_files}
+    hashes = {source: hash_file(Path(path)) for source, path in sources.items()}
+    changed, removed = manifest.diff(hashes)
+    document_cache = DocumentCache(knowledge_dir / DOCUMENT_CACHE_DIRNAME)
 
-    async def create_summary(doc: DoclingDocument):
-        llm = LLM(model="gpt-4.1")
-        snippet = doc.export_to_markdown()[:1000]
+    if rechunk:
+        changed = list(hashes)
 
-        summary = llm.call(messages=[{
-            "role": "system",
-            "content": dedent(
-                f"""
-                You are an assistant that analyzes documents. You classify the snippet and create a summary of 3 sentences without giving details about the contents. Always use the document's language. Use the following md-format without fences like "```":
+    for source in removed:
+        entry = manifest.entries.pop(source)
+        if entry.chunk_ids:
+            store.delete(entry.chunk_ids)
+        (knowledge_dir / f"{entry.title}.summary.md").unlink(missing_ok=True)
+        print(f"Removed: {source}")
 
-                ```
-                ## {doc.name}
-    
-                Type: <type of document, e.g., Contract, Report, Email, Invoice, etc.>
-                Creator: <document creator if available>
-                Audience: <intended audience if available>
-                Summary: <three-sentence summary>
-                ```
-                """)
-        }, {
-            "role": "user",
-            "content": snippet
-        }])
+    lexical_index_dir = knowledge_dir / INDEX_DIRNAME
 
-        summary_path = knowledge_dir / f"{doc.name}.summary.md"
-        summary_path.write_text(summary, encoding="utf-8")
+    def build_lexical_index():
+        count = LexicalIndex.build(
+            ((doc_id, content) for doc_id, content, _ in store.iter_chunks()),
+            lexical_index_dir,
+        )
+        print(f"Lexical index built over {count} chunk(s).")
+
+    if not changed:
+        manifest.save()
+        if full or removed or not lexical_index_dir.exists():
+            build_lexical_index()
+            write_collection_version(knowledge_dir)
+        document_cache.prune(hashes.values())
+        prune_summary_cache(knowledge_dir, (entry.summary_key for entry in manifest.entries.values()))
+        print("Knowledge is up to date.")
+        return
 
+    for source in changed:
+        print(f"{'Changed' if source in manifest.entries else 'New'}: {source}")
 
-    async def process_document(doc):
-        await create_summary(doc)
+    chunker = create_chunker(ChunkingConfig())
 
+    async def process_document(source: str, doc: DoclingDocument):
+        """Chunk a document, returning its manifest entry, new chunks and stale chunk ids."""
         doc_chunks = await chunker.chunk_document(
             doc.export_to_markdown(),
             doc.name,
@@ -176,12 +258,30 @@ def import_knowledge():
             doc.origin.model_dump(),
             doc, # type: ignore
         )
-        
+
+        chunk_hashes = [hash_text(chunk.content) for chunk in doc_chunks]
+        chunk_ids = [chunk_id(source, chunk.index, h) for chunk, h in zip(doc_chunks, chunk_hashes)]
+
+        # Chunks with an unchanged id are already stored with the same content
+        previous = manifest.entries.get(source)
+        known_ids = set(previous.chunk_ids) if previous else set()
+        stale_ids = list(known_ids - set(chunk_ids))
+
+        entry = ManifestEntry(
+            content_hash=hashes[source],
+            title=doc.name,
+            chunk_hashes=chunk_hashes,
+            chunk_ids=chunk_ids,
+        )
+
         result = []
 
-        for chunk in doc_chunks:
-            result.append(            {
-                "doc_id": uuid4().hex,
+        for chunk, doc_id in zip(doc_chunks, chunk_ids):
+            if doc_id in known_ids:
+                continue
+
+            result.append({
+                "doc_id": doc_id,
                 "content": chunk.content,
                 "metadata": {
                     "chunk_index": chunk.index,
@@ -191,15 +291,165 @@ def import_knowledge():
                 },
             })
         
-        return result
+        return entry, result, stale_ids
+
+    paths = {sources[source]: source for source in changed}
+    stats = {"imported": 0, "deleted": 0}
+    manifest_lock = threading.Lock()
+
+    def on_stored(source: str, entry: ManifestEntry, stale_ids: list[str]):
+        """Record a document once all its new chunks are stored, so an interrupted run resumes with it."""
+        def done():
+            if stale_ids:
+                store.delete(stale_ids)
+
+            with manifest_lock:
+                manifest.entries[source] = entry
+                manifest.save()
+                stats["imported"] += 1
+                stats["deleted"] += len(stale_ids)
+
+            print(f"Imported: {source}")
+
+        return done
+
+    def on_summarized(entry: ManifestEntry):
+        """Record the summary's cache key once the summary is written."""
+        def done(summary_key: str):
+            with manifest_lock:
+                entry.summary_key = summary_key
+
+        return done
+
+    try:
+        # Summaries are LLM round trips, they run in the background while the
+        # next documents are converted and embedded
+        with SummaryGenerator(knowledge_dir, concurrency=summary_concurrency) as summaries, \
+                BatchUpserter(store, batch_size=batch_size) as upserter:
+            # Chunks are embedded and stored in batches as soon as a document
+            # is converted, so only a bounded number of them is held at a time
+            documents = convert_documents(
+                list(paths),
+                workers=workers,
+                converter=converter,
+                cache=document_cache,
+                hashes={path: hashes[source] for path, source in paths.items()},
+            )
+
+            for path, doc in documents:
+                source = paths[path]
+                entry, doc_chunks, stale_ids = asyncio.run(process_document(source, doc))
+                summaries.submit(doc, on_done=on_summarized(entry))
+                upserter.add(doc_chunks, on_done=on_stored(source, entry, stale_ids))
+
+        # Summary keys recorded after their document was stored
+        manifest.save()
+        build_lexical_index()
+        document_cache.prune(hashes.values())
+        prune_summary_cache(knowledge_dir, (entry.summary_key for entry in manifest.entries.values()))
+    finally:
+        # Invalidates cached search results
+        write_collection_version(knowledge_dir)
+
+    print(f"Imported {stats['imported']} of {len(changed)} file(s): {upserter.stored} chunk(s) embedded, {stats['deleted']} stale chunk(s) deleted.")
+    print(f"Conversions: {document_cache.hits} of {len(changed)} from cache.")
+    print(f"Summaries: {summaries.cache_hits} from cache, {summaries.cache_misses} generated.")
+    inference_cache = get_inference_cache().stats()
+    print(f"Embeddings: {inference_cache['hits']['embedding']} from cache, {inference_cache['misses']['embedding']} computed.")
+
+    if summaries.failed:
+        print(f"{summaries.failed} summary(ies) failed, the next import retries them.")
+        sys.exit(1)
+
+
+@click.command()
+@click.option('--output', '-o', type=click.Path(dir_okay=False, path_type=Path), default=None, help='JSON result file (default: bench/results/<timestamp>.json)')
+@click.option('--queries', 'queries_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), default=DEFAULT_QUERIES, show_default=True, help='Labelled queries for the retrieval benchmark')
+@click.option('--files', default=3, show_default=True, type=click.IntRange(min=0), help='Number of knowledge files to ingest, 0 skips the ingestion benchmark')
+@click.option('--workers', '-w', default=default_workers(), show_default=True, type=click.IntRange(min=1), help='Number of processes converting documents in parallel')
+@click.option('--batch-size', default=64, show_default=True, type=click.IntRange(min=1), help='Number of chunks embedded and stored at once')
+@click.option('--top-k', '-k', default=5, show_default=True, type=click.IntRange(min=1), help='Cutoff for recall@k')
+@click.option('--repeat', default=3, show_default=True, type=click.IntRange(min=0), help='Timed rounds over the query set, 0 only measures quality')
+@click.option('--skip-retrieval', is_flag=True, help='Skip the retrieval benchmark')
+@click.option('--rerank-backends', default=",".join(RERANKER_BACKENDS), show_default=True, help='Comma-separated reranker backends to compare, empty skips the reranker benchmark')
+@click.option('--vector-stores', default=",".join(VECTOR_STORE_BACKENDS), show_default=True, help='Comma-separated vector store backends to compare in the ingestion benchmark')
+def bench(output: Path | None, queries_path: Path, files: int, workers: int, batch_size: int, top_k: int, repeat: int, skip_retrieval: bool, rerank_backends: str, vector_stores: str):
+    """
+    Benchmark ingestion and retrieval against the local knowledge.
+    """
+    from crew.tools import document_search
+
+    started = datetime.now()
+    result = {
+        "started": started.isoformat(timespec="seconds"),
+        "config": {
+            "chunking": asdict(ChunkingConfig()),
+            "vector_top_k": document_search.VECTOR_TOP_K,
+            "lexical_top_k": document_search.LEXICAL_TOP_K,
+            "fusion_top_k": document_search.FUSION_TOP_K,
+            "rerank_top_k": document_search.RERANK_TOP_K,
+            "retrieval": asdict(document_search.RetrievalConfig.from_env()),
+            "reranker": asdict(RerankerConfig.from_env()),
+            "vector_store": VectorStoreConfig.from_env().backend,
+        },
+    }
+
+    stores = [backend.strip() for backend in vector_stores.split(",") if backend.strip()]
+    unknown = set(stores) - set(VECTOR_STORE_BACKENDS)
+    if unknown:
+        raise click.BadParameter(f"Unknown vector store(s): {', '.join(sorted(unknown))}", param_hint="--vector-stores")
+
+    if files:
+        paths = sorted(str(p) for p in Path(KNOWLEDGE_DIRECTORY).glob("*.pdf"))[:files]
+        print(f"Ingestion benchmark over {len(paths)} file(s)...")
+        result["ingestion"] = run_ingestion_bench(paths, workers=workers, batch_size=batch_size, vector_stores=stores)
+
+        for stage, stats in result["ingestion"]["stages"].items():
+            print(f"  {stage:<12} {stats['seconds']:8.2f}s")
+
+        for backend, stats in result["ingestion"]["vector_stores"].items():
+            print(f"  {backend:<12} upsert {stats['upsert_seconds']:8.2f}s  "
+                  f"query p50={stats['query']['p50_ms']:6.1f}ms  window p50={stats['window']['p50_ms']:6.1f}ms")
+
+    if not skip_retrieval:
+        queries = load_queries(queries_path)
+        print(f"Retrieval benchmark over {len(queries)} queries...")
+        result["retrieval"] = run_retrieval_bench(queries, k=top_k, repeat=repeat)
+
+        for stage, latency in result["retrieval"]["latency"].items():
+            print(f"  {stage:<12} p50={latency['p50_ms']:8.1f}ms  p95={latency['p95_ms']:8.1f}ms")
+        print(f"  recall@{top_k}={result['retrieval'][f'recall@{top_k}']:.3f}  mrr={result['retrieval']['mrr']:.3f}")
+        print(f"  {result['retrieval']['reranked_pairs_per_query']:.1f} pairs reranked per query")
+
+        calibration = {name: value for name, value in result["retrieval"]["calibration"].items() if value is not None}
+        if calibration:
+            print("  Thresholds keeping every relevant hit: " + ", ".join(
+                f"SEARCH_{name.upper()}={value:.3f}" for name, value in calibration.items()))
+
+    backends = [backend.strip() for backend in rerank_backends.split(",") if backend.strip()]
+    unknown = set(backends) - set(RERANKER_BACKENDS)
+    if unknown:
+        raise click.BadParameter(f"Unknown backend(s): {', '.join(sorted(unknown))}", param_hint="--rerank-backends")
+
+    if backends:
+        queries = load_queries(queries_path)
+        print(f"Reranker benchmark over {len(queries)} queries...")
+        result["reranker"] = run_reranker_bench(queries, backends, repeat=max(repeat, 1))
+
+        for backend, stats in result["reranker"]["backends"].items():
+            if "error" in stats:
+                print(f"  {backend:<12} failed: {stats['error']}")
+                continue
 
-    async def main():
-        results = await asyncio.gather(*(process_document(doc) for doc in content))
-        for doc_chunks in results:
-            chunks.extend(doc_chunks)
+            line = f"  {backend:<12} p50={stats['latency']['p50_ms']:8.1f}ms  {stats['pairs_per_second']:8.1f} pairs/s  x{stats.get('speedup', 1.0):.2f}"
+            if "max_abs_drift" in stats:
+                line += f"  drift max={stats['max_abs_drift']:.4f} mean={stats['mean_abs_drift']:.4f}"
+            print(line)
 
-    asyncio.run(main())
-    client.add_documents(collection_name="knowledge", documents=chunks)
+    output = output or Path("bench/results") / f"{started.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Results written to {output}")
 
 
 @click.group()
@@ -211,4 +461,5 @@ if __name__ == '__main__':
     cli.add_command(kickoff)
     cli.add_command(download_knowledge)
     cli.add_command(import_knowledge)
+    cli.add_command(bench)
     cli()